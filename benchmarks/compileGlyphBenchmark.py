@@ -0,0 +1,81 @@
+"""
+Regression benchmark for compileGlyph.
+
+Run this in RoboFont with a designspace open. It
+compiles strings of increasing length at the default
+location and reports the number of interpolations
+and the time per glyph. Both should stay flat as the
+string grows. If they grow with the string length,
+compileGlyph has regressed to quadratic behavior.
+"""
+
+import time
+from spaceranger import compileGlyph
+
+
+class CountingOperator:
+
+    """
+    Wrap a UFOOperator and count makeOneGlyph calls.
+    """
+
+    def __init__(self, ufoOperator):
+        self.ufoOperator = ufoOperator
+        self.makeOneGlyphCount = 0
+
+    def __getattr__(self, attr):
+        return getattr(self.ufoOperator, attr)
+
+    def makeOneGlyph(self, *args, **kwargs):
+        self.makeOneGlyphCount += 1
+        return self.ufoOperator.makeOneGlyph(*args, **kwargs)
+
+
+def runBenchmark(ufoOperator, text="HAMBURGEFONSTIV", lengths=(5, 10, 20, 40, 80), repeat=5):
+    cmap = ufoOperator.getCharacterMapping()
+    glyphNames = []
+    for character in text:
+        names = cmap.get(ord(character))
+        if names:
+            glyphNames.append(names[0])
+    if not glyphNames:
+        raise ValueError("None of the characters in the text are in the designspace.")
+    location = ufoOperator.newDefaultLocation(bend=True)
+    results = []
+    for length in lengths:
+        names = (glyphNames * (length // len(glyphNames) + 1))[:length]
+        operator = CountingOperator(ufoOperator)
+        start = time.perf_counter()
+        for i in range(repeat):
+            compileGlyph(
+                glyphNames=names,
+                ufoOperator=operator,
+                location=location
+            )
+        duration = (time.perf_counter() - start) / repeat
+        results.append(
+            dict(
+                length=length,
+                interpolations=operator.makeOneGlyphCount // repeat,
+                seconds=duration,
+                secondsPerGlyph=duration / length
+            )
+        )
+    return results
+
+
+if __name__ == "__main__":
+    ufoOperator = CurrentDesignspace()
+    results = runBenchmark(ufoOperator)
+    print("length  interpolations  ms/string  ms/glyph")
+    for result in results:
+        print(
+            f"{result['length']:>6}"
+            f"  {result['interpolations']:>14}"
+            f"  {result['seconds'] * 1000:>9.3f}"
+            f"  {result['secondsPerGlyph'] * 1000:>8.4f}"
+        )
+    first = results[0]
+    last = results[-1]
+    growth = last["secondsPerGlyph"] / first["secondsPerGlyph"]
+    print(f"per glyph cost growth from {first['length']} to {last['length']} glyphs: {growth:.2f}x")
@@ -0,0 +1,255 @@
+"""
+Phase benchmark for the grid engine.
+
+This runs outside of RoboFont. It generates a synthetic
+designspace, builds grids of increasing size and times
+each phase of the engine:
+
+- locations: making the cell locations
+- glyphNames: processing the glyph names and rules
+- kerning: interpolating the kerning
+- measure: measuring the strings
+- layout: measuring the columns and positioning the cells
+- compile: interpolating and compiling the glyphs
+- kinks: the kink analysis
+
+The time until the first batch of cells in a window
+sized visible rect is ready is reported as `firstCells`.
+
+The results are written as JSON so that runs can be
+compared over time. To compare two runs:
+
+    python gridBenchmark.py --output new.json --compare old.json
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import platform
+import argparse
+import statistics
+import importlib.util
+
+if importlib.util.find_spec("spaceranger") is None:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source", "lib"))
+from spaceranger import SpaceRangerGrid
+from ufoProcessor.ufoOperator import UFOOperator
+from syntheticDesignspace import makeSyntheticDesignspace
+
+defaultGridSizes = (2, 5, 10, 20, 30, 50)
+
+phaseNames = (
+    "locations",
+    "glyphNames",
+    "kerning",
+    "measure",
+    "layout",
+    "compile",
+    "kinks"
+)
+
+# roughly what fits in a window at 100%
+visibleRect = (0, 0, 1200, 800)
+
+def timeGrid(ufoOperator, settings):
+    """
+    Build a grid with cold caches and time each phase.
+    This returns a dict of phase name : seconds.
+    """
+    times = {}
+    grid = SpaceRangerGrid(ufoOperator, dict(settings))
+    start = time.perf_counter()
+    grid.buildCells()
+    times["locations"] = time.perf_counter() - start
+    start = time.perf_counter()
+    grid.prepareCells()
+    cells = grid.findDirtyCells()
+    times["glyphNames"] = time.perf_counter() - start
+    start = time.perf_counter()
+    cellKerning = grid.interpolateKerning(cells)
+    times["kerning"] = time.perf_counter() - start
+    start = time.perf_counter()
+    grid.measureCells(cells, cellKerning, fullUpdate=True)
+    times["measure"] = time.perf_counter() - start
+    start = time.perf_counter()
+    layoutChanged = grid.measureColumns(fullUpdate=True)
+    grid.layoutCells(cells, layoutChanged=layoutChanged)
+    times["layout"] = time.perf_counter() - start
+    start = time.perf_counter()
+    grid.compileCells(cells, fullUpdate=True)
+    times["compile"] = time.perf_counter() - start
+    start = time.perf_counter()
+    grid.updateKinkModel()
+    grid.findCellKinks(cells)
+    times["kinks"] = time.perf_counter() - start
+    return times
+
+def timeFirstCells(ufoOperator, settings):
+    """
+    Build a grid with cold caches and time how long
+    it takes for the visible cells to be ready.
+    """
+    grid = SpaceRangerGrid(ufoOperator, dict(settings))
+    grid.visibleRect = visibleRect
+    start = time.perf_counter()
+    grid.buildCells()
+    grid.prepareCells()
+    updates = grid.iterateUpdateCells()
+    next(updates)
+    duration = time.perf_counter() - start
+    updates.close()
+    return duration
+
+def runGridBenchmark(ufoOperator, glyphNames, gridSizes=defaultGridSizes, repeat=3, applyRules=False):
+    """
+    Time square grids of each size in `gridSizes`.
+    The median and minimum of `repeat` runs are reported.
+    """
+    axisNames = [axis.name for axis in ufoOperator.getOrderedContinuousAxes()]
+    results = []
+    for gridSize in gridSizes:
+        settings = dict(
+            glyphNames=glyphNames,
+            applyRules=applyRules,
+            applyKerning=True,
+            highlightKinks=True,
+            xAxisName=axisNames[0],
+            xAxisCount=gridSize,
+            yAxisName=None,
+            yAxisCount=gridSize
+        )
+        if len(axisNames) > 1:
+            settings["yAxisName"] = axisNames[1]
+        runs = [timeGrid(ufoOperator, settings) for i in range(repeat)]
+        firstCells = [timeFirstCells(ufoOperator, settings) for i in range(repeat)]
+        phases = {}
+        for phaseName in phaseNames:
+            values = [run[phaseName] for run in runs]
+            phases[phaseName] = dict(
+                median=statistics.median(values),
+                minimum=min(values)
+            )
+        totals = [sum(run[phaseName] for phaseName in phaseNames) for run in runs]
+        rowCount = gridSize if settings["yAxisName"] else 1
+        results.append(
+            dict(
+                columns=gridSize,
+                rows=rowCount,
+                cells=gridSize * rowCount,
+                phases=phases,
+                total=dict(
+                    median=statistics.median(totals),
+                    minimum=min(totals)
+                ),
+                firstCells=dict(
+                    median=statistics.median(firstCells),
+                    minimum=min(firstCells)
+                )
+            )
+        )
+    return results
+
+def compareResults(old, new):
+    """
+    Print the ratio of the new median times
+    to the old median times.
+    """
+    oldResults = {(r["columns"], r["rows"]): r for r in old["results"]}
+    print("grid      " + "  ".join(f"{name:>10}" for name in phaseNames + ("total", "firstCells")))
+    for result in new["results"]:
+        key = (result["columns"], result["rows"])
+        oldResult = oldResults.get(key)
+        if oldResult is None:
+            continue
+        ratios = []
+        for phaseName in phaseNames:
+            ratios.append(_ratio(oldResult["phases"].get(phaseName), result["phases"][phaseName]))
+        ratios.append(_ratio(oldResult["total"], result["total"]))
+        ratios.append(_ratio(oldResult.get("firstCells"), result["firstCells"]))
+        title = f"{key[0]}x{key[1]}"
+        print(f"{title:<10}" + "  ".join(_formatRatio(ratio) for ratio in ratios))
+
+def _ratio(old, new):
+    # older results may not have every phase
+    if old is None:
+        return None
+    if not old["median"]:
+        return 1.0
+    return new["median"] / old["median"]
+
+def _formatRatio(ratio):
+    if ratio is None:
+        return f"{'-':>10}"
+    return f"{ratio:>9.2f}x"
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Space Ranger grid engine.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(defaultGridSizes), help="The grid sizes.")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of runs per grid size.")
+    parser.add_argument("--axes", type=int, default=2, help="The number of axes.")
+    parser.add_argument("--intermediates", type=int, default=0, help="The number of intermediate sources.")
+    parser.add_argument("--glyphs", type=int, default=26, help="The number of glyphs.")
+    parser.add_argument("--contours", type=int, default=2, help="The number of contours per glyph.")
+    parser.add_argument("--segments", type=int, default=8, help="The number of segments per contour.")
+    parser.add_argument("--kerning", type=int, default=100, help="The number of kerning pairs.")
+    parser.add_argument("--groups", type=int, default=0, help="The number of kerning groups per side.")
+    parser.add_argument("--rules", type=int, default=0, help="The number of rules.")
+    parser.add_argument("--text", type=int, default=10, help="The number of glyphs in the text.")
+    parser.add_argument("--output", help="The JSON file to write. The results are printed if this is not given.")
+    parser.add_argument("--compare", help="A previous JSON file to compare the results to.")
+    arguments = parser.parse_args(arguments)
+    designspaceOptions = dict(
+        axisCount=arguments.axes,
+        intermediateSourceCount=arguments.intermediates,
+        glyphCount=arguments.glyphs,
+        contourCount=arguments.contours,
+        segmentsPerContour=arguments.segments,
+        kerningPairCount=arguments.kerning,
+        kerningGroupCount=arguments.groups,
+        ruleCount=arguments.rules
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        path = makeSyntheticDesignspace(directory, **designspaceOptions)
+        ufoOperator = UFOOperator(path)
+        ufoOperator.loadFonts()
+        # ufoOperator.glyphNames is not populated on the
+        # first load, so get the names from the fonts.
+        glyphNames = set()
+        for font in ufoOperator.fonts.values():
+            glyphNames.update(font.keys())
+        glyphNames = sorted(name for name in glyphNames if not name.endswith(".alt"))
+        glyphNames = (glyphNames * (arguments.text // len(glyphNames) + 1))[:arguments.text]
+        results = runGridBenchmark(
+            ufoOperator,
+            glyphNames,
+            gridSizes=arguments.sizes,
+            repeat=arguments.repeat,
+            applyRules=bool(arguments.rules)
+        )
+    data = dict(
+        environment=dict(
+            python=platform.python_version(),
+            platform=platform.platform(),
+            time=time.strftime("%Y-%m-%dT%H:%M:%S")
+        ),
+        designspace=designspaceOptions,
+        textLength=arguments.text,
+        repeat=arguments.repeat,
+        results=results
+    )
+    text = json.dumps(data, indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            old = json.load(f)
+        compareResults(old, data)
+
+
+if __name__ == "__main__":
+    main()
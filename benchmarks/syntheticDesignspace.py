@@ -0,0 +1,210 @@
+"""
+Generate synthetic designspaces for benchmarking.
+
+The designspaces don't look like anything, but the
+structure (axes, sources, glyphs, contours, kerning
+and rules) can be scaled independently so that the
+cost of each part of a Space Ranger grid can be
+measured. The output is deterministic for a given
+set of arguments.
+"""
+
+import os
+import math
+import random
+from fontTools.designspaceLib import (
+    DesignSpaceDocument,
+    AxisDescriptor,
+    SourceDescriptor,
+    RuleDescriptor
+)
+from fontParts.fontshell import RFont
+
+axisNames = [
+    ("width", "wdth"),
+    ("weight", "wght"),
+    ("optical", "opsz"),
+    ("contrast", "CNTR"),
+    ("slant", "slnt"),
+    ("serif", "SERF")
+]
+axisMinimum = 0
+axisMaximum = 1000
+
+unitsPerEm = 1000
+
+def makeSyntheticDesignspace(
+        directory,
+        axisCount=2,
+        intermediateSourceCount=0,
+        glyphCount=26,
+        contourCount=2,
+        segmentsPerContour=8,
+        kerningPairCount=100,
+        kerningGroupCount=0,
+        ruleCount=0,
+        seed=0
+    ):
+    """
+    Write a designspace and its sources to `directory`.
+    This returns the path to the designspace.
+
+    - `axisCount` The number of continuous axes.
+    - `intermediateSourceCount` The number of sources
+      inside the designspace. A source is always made
+      for each corner of the designspace.
+    - `glyphCount` The number of glyphs.
+    - `contourCount` The number of contours per glyph.
+    - `segmentsPerContour` The number of curve segments
+      per contour. Every on curve point is smooth.
+    - `kerningPairCount` The number of kerning pairs.
+    - `kerningGroupCount` The number of first and second
+      kerning groups. Each group has three glyphs and
+      some of the pairs will use them.
+    - `ruleCount` The number of substitution rules. Each
+      rule substitutes a glyph with a ".alt" glyph in
+      the upper half of the first axis.
+    """
+    if axisCount > len(axisNames):
+        raise ValueError(f"No more than {len(axisNames)} axes are supported.")
+    randomizer = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    doc = DesignSpaceDocument()
+    # axes
+    axes = axisNames[:axisCount]
+    for name, tag in axes:
+        axis = AxisDescriptor()
+        axis.name = name
+        axis.tag = tag
+        axis.minimum = axisMinimum
+        axis.default = axisMinimum
+        axis.maximum = axisMaximum
+        doc.addAxis(axis)
+    # source locations
+    sourceLocations = []
+    for corner in range(2 ** axisCount):
+        location = {}
+        for axisIndex, (name, tag) in enumerate(axes):
+            if corner & (1 << axisIndex):
+                location[name] = axisMaximum
+            else:
+                location[name] = axisMinimum
+        sourceLocations.append(location)
+    for i in range(intermediateSourceCount):
+        location = {}
+        for name, tag in axes:
+            location[name] = randomizer.randint(1, 9) * (axisMaximum // 10)
+        if location not in sourceLocations:
+            sourceLocations.append(location)
+    # glyph names
+    glyphNames = [f"glyph{i:04d}" for i in range(glyphCount)]
+    alternateGlyphNames = {}
+    for glyphName in glyphNames[:ruleCount]:
+        alternateGlyphNames[glyphName] = glyphName + ".alt"
+    # kerning
+    # a glyph can only be in one group per side
+    groups = {}
+    for side in ("public.kern1.", "public.kern2."):
+        members = list(glyphNames)
+        randomizer.shuffle(members)
+        for i in range(kerningGroupCount):
+            groupMembers = members[i * 3:(i + 1) * 3]
+            if not groupMembers:
+                break
+            groups[f"{side}group{i}"] = groupMembers
+    firstSides = list(glyphNames) + [name for name in groups if name.startswith("public.kern1.")]
+    secondSides = list(glyphNames) + [name for name in groups if name.startswith("public.kern2.")]
+    kerningPairs = set()
+    maximumPairCount = len(firstSides) * len(secondSides)
+    while len(kerningPairs) < min(kerningPairCount, maximumPairCount):
+        kerningPairs.add((randomizer.choice(firstSides), randomizer.choice(secondSides)))
+    kerningPairs = sorted(kerningPairs)
+    kerningValues = {pair: randomizer.randint(-100, 50) for pair in kerningPairs}
+    # sources
+    for sourceIndex, location in enumerate(sourceLocations):
+        font = RFont()
+        factors = [location[name] / axisMaximum for name, tag in axes]
+        font.info.familyName = "Synthetic"
+        font.info.styleName = f"Source {sourceIndex}"
+        font.info.unitsPerEm = unitsPerEm
+        font.info.ascender = 750
+        font.info.descender = -250
+        for glyphIndex, glyphName in enumerate(glyphNames):
+            glyph = font.newGlyph(glyphName)
+            glyph.unicodes = [0xE000 + glyphIndex]
+            drawSyntheticGlyph(glyph, factors, contourCount, segmentsPerContour, randomizer)
+            alternateGlyphName = alternateGlyphNames.get(glyphName)
+            if alternateGlyphName is not None:
+                glyph = font.newGlyph(alternateGlyphName)
+                drawSyntheticGlyph(glyph, factors, contourCount + 1, segmentsPerContour, randomizer)
+        font.groups.update(groups)
+        for pair, value in kerningValues.items():
+            font.kerning[pair] = value * (1 + sum(factors))
+        fileName = f"source{sourceIndex}.ufo"
+        path = os.path.join(directory, fileName)
+        font.save(path)
+        source = SourceDescriptor()
+        source.path = path
+        source.filename = fileName
+        source.name = f"source{sourceIndex}"
+        source.location = location
+        doc.addSource(source)
+    # rules
+    if axes:
+        firstAxisName = axes[0][0]
+        for glyphName, alternateGlyphName in alternateGlyphNames.items():
+            rule = RuleDescriptor()
+            rule.name = f"{glyphName} alternate"
+            rule.conditionSets.append([
+                dict(
+                    name=firstAxisName,
+                    minimum=axisMaximum / 2,
+                    maximum=axisMaximum
+                )
+            ])
+            rule.subs.append((glyphName, alternateGlyphName))
+            doc.addRule(rule)
+    path = os.path.join(directory, "Synthetic.designspace")
+    doc.write(path)
+    return path
+
+def drawSyntheticGlyph(glyph, factors, contourCount, segmentsPerContour, randomizer):
+    """
+    Draw `contourCount` ellipses made of `segmentsPerContour`
+    curves. `factors` are the normalized axis values and
+    they change the proportions of the contours.
+    """
+    # the first factor behaves like a width axis,
+    # the second like a weight axis and the rest
+    # add noise so that the sources aren't linear.
+    widthFactor = factors[0] if factors else 0
+    weightFactor = factors[1] if len(factors) > 1 else 0
+    otherFactor = sum(factors[2:])
+    contourWidth = 200 + (200 * widthFactor)
+    contourHeight = 300 + (100 * weightFactor)
+    spacing = 50 + (50 * weightFactor)
+    pen = glyph.getPointPen()
+    x = spacing
+    for contourIndex in range(contourCount):
+        centerX = x + (contourWidth / 2)
+        centerY = 250 + (contourIndex % 2) * 100
+        radiusX = contourWidth / 2
+        radiusY = contourHeight / 2
+        pen.beginPath()
+        for segmentIndex in range(segmentsPerContour):
+            angle1 = 2 * math.pi * segmentIndex / segmentsPerContour
+            angle2 = 2 * math.pi * (segmentIndex + 1) / segmentsPerContour
+            handleLength = (4 / 3) * math.tan((angle2 - angle1) / 4)
+            noise = otherFactor * randomizer.uniform(-5, 5)
+            x1 = centerX + radiusX * (math.cos(angle1) - handleLength * math.sin(angle1))
+            y1 = centerY + radiusY * (math.sin(angle1) + handleLength * math.cos(angle1))
+            x2 = centerX + radiusX * (math.cos(angle2) + handleLength * math.sin(angle2))
+            y2 = centerY + radiusY * (math.sin(angle2) - handleLength * math.cos(angle2))
+            x3 = centerX + radiusX * math.cos(angle2)
+            y3 = centerY + radiusY * math.sin(angle2)
+            pen.addPoint((round(x1 + noise), round(y1)))
+            pen.addPoint((round(x2 + noise), round(y2)))
+            pen.addPoint((round(x3), round(y3)), segmentType="curve", smooth=True)
+        pen.endPath()
+        x += contourWidth + spacing
+    glyph.width = round(x)
@@ -0,0 +1,178 @@
+from collections import OrderedDict
+
+# -------------
+# Location Keys
+# -------------
+
+locationKeyPrecision = 4
+
+def makeLocationKey(location):
+    """
+    Make a hashable key for `location`. The values are
+    rounded so that float noise doesn't create new keys.
+    Use this whenever locations are compared.
+    """
+    if not location:
+        return ()
+    return tuple(
+        sorted(
+            (name, roundLocationValue(value))
+            for name, value in location.items()
+            if name is not None
+        )
+    )
+
+def roundLocationValue(value):
+    """
+    Round an axis value the way `makeLocationKey` does.
+    """
+    return round(value, locationKeyPrecision)
+
+# ------------------------
+# Interpolated Glyph Cache
+# ------------------------
+
+# The cache size is estimated from the number of
+# points in the cached glyphs. These are rough
+# numbers for the arrays in a CompiledGlyph.
+estimatedGlyphBytes = 512
+estimatedPointBytes = 32
+
+defaultInterpolatedGlyphCacheSize = 32 * 1024 * 1024
+
+class InterpolatedGlyphCache:
+
+    """
+    A least recently used cache of interpolated glyphs
+    keyed by glyph name, location and discrete location.
+
+    - `maximumSize` The approximate number of bytes
+      the cached glyphs may use.
+    """
+
+    def __init__(self, maximumSize=defaultInterpolatedGlyphCacheSize):
+        self.maximumSize = maximumSize
+        self._entries = OrderedDict()
+        self._keysForGlyphName = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _makeKey(self, glyphName, location, discreteLocation, smooth):
+        return (
+            glyphName,
+            makeLocationKey(location),
+            makeLocationKey(discreteLocation),
+            smooth
+        )
+
+    def get(self, glyphName, location, discreteLocation=None, smooth=False, fallback=None):
+        key = self._makeKey(glyphName, location, discreteLocation, smooth)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return fallback
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, glyphName, location, glyph, discreteLocation=None, smooth=False):
+        key = self._makeKey(glyphName, location, discreteLocation, smooth)
+        if key in self._entries:
+            self._removeKey(key)
+        size = estimateGlyphSize(glyph)
+        self._entries[key] = (glyph, size)
+        self._size += size
+        if glyphName not in self._keysForGlyphName:
+            self._keysForGlyphName[glyphName] = set()
+        self._keysForGlyphName[glyphName].add(key)
+        while self._size > self.maximumSize and len(self._entries) > 1:
+            oldestKey = next(iter(self._entries))
+            self._removeKey(oldestKey)
+
+    def _removeKey(self, key):
+        glyph, size = self._entries.pop(key)
+        self._size -= size
+        glyphName = key[0]
+        keys = self._keysForGlyphName[glyphName]
+        keys.discard(key)
+        if not keys:
+            del self._keysForGlyphName[glyphName]
+
+    def getGlyphNames(self):
+        return set(self._keysForGlyphName.keys())
+
+    def invalidateGlyphNames(self, glyphNames):
+        """
+        Remove all entries for the glyphs in `glyphNames`.
+        """
+        for glyphName in glyphNames:
+            for key in list(self._keysForGlyphName.get(glyphName, ())):
+                self._removeKey(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._keysForGlyphName.clear()
+        self._size = 0
+
+
+# ----------------
+# Glyph Path Cache
+# ----------------
+
+defaultGlyphPathCacheSize = 16 * 1024 * 1024
+
+class GlyphPathCache:
+
+    """
+    A least recently used cache of drawable paths
+    keyed by the content hash of the outline they
+    were made from.
+
+    - `maximumSize` The approximate number of bytes
+      the cached paths may use.
+    """
+
+    def __init__(self, maximumSize=defaultGlyphPathCacheSize):
+        self.maximumSize = maximumSize
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, glyph, fallback=None):
+        key = glyph.getContentHash()
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return fallback
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, glyph, path):
+        key = glyph.getContentHash()
+        if key in self._entries:
+            self._size -= self._entries.pop(key)[1]
+        size = estimateGlyphSize(glyph)
+        self._entries[key] = (path, size)
+        self._size += size
+        while self._size > self.maximumSize and len(self._entries) > 1:
+            self._size -= self._entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+
+def estimateGlyphSize(glyph):
+    if glyph is None:
+        return estimatedGlyphBytes
+    pointCount = len(glyph.coordinates)
+    return estimatedGlyphBytes + (pointCount * estimatedPointBytes)
@@ -0,0 +1,1339 @@
+"""
+The grid engine.
+
+Everything in here works without RoboFont, merz or
+AppKit. It only needs a UFOOperator (or anything
+with the same API, like ufoProcessor's UFOOperator)
+and a settings dict. The window controller renders
+what the engine produces.
+"""
+
+import math
+import bisect
+from .caches import (
+    InterpolatedGlyphCache,
+    makeLocationKey,
+    roundLocationValue
+)
+from .variations import GlyphVariationModels
+from .outlines import (
+    compileGlyphFromPoints,
+    joinCompiledGlyphs
+)
+from .kinks import (
+    KinkModel,
+    findKinks
+)
+from .kerning import (
+    KerningEvaluator,
+    getGlyphPairs
+)
+from .rules import RuleSubstitutions
+from .locations import LocationIndex
+from .metrics import VerticalMetricsEvaluator
+from .timing import (
+    PhaseTimer,
+    timedPhase
+)
+
+itemPointSize = 100
+itemPadding = itemPointSize * 0.1
+itemSpacing = itemPointSize * 0.1
+itemHeight = itemPointSize + (itemPadding * 2)
+gridInset = itemPointSize * 0.1
+
+# The number of cells compiled between
+# progress reports during an update.
+defaultCellBatchSize = 50
+
+# --------
+# Settings
+# --------
+
+defaultGridSettings = dict(
+    discreteLocation=None,
+    glyphNames=[],
+
+    applyRules=False,
+    applyKerning=True,
+
+    xAxisName=None,
+    xAxisMode="count", # count | locations | instances
+    xAxisCount=5,
+    xAxisLocations=[-1000, 0, 1000],
+    xAxisReverse=False,
+
+    yAxisName=None,
+    yAxisMode="count",
+    yAxisCount=5,
+    yAxisLocations=[-1000, 0, 1000],
+    yAxisReverse=False,
+
+    columnWidthMode="fit",
+
+    insertSources=False,
+    insertInstances=False,
+
+    highlightKinks=False,
+    highlightSourceKinks=True,
+    autoSmoothDefault=True,
+)
+
+# ----
+# Grid
+# ----
+
+class GridCell:
+
+    """
+    One location in the grid.
+    """
+
+    __slots__ = (
+        "index",
+        "columnIndex",
+        "rowIndex",
+        "location",
+        "locationKey",
+        "isSource",
+        "isInstance",
+        "processedGlyphNames",
+        "glyphNames",
+        "glyphPairs",
+        "glyph",
+        "kerning",
+        "width",
+        "unitsPerEm",
+        "descender",
+        "scale",
+        "kinks",
+        "position",
+        "size",
+        "glyphPosition"
+    )
+
+    def __init__(self, index, columnIndex, rowIndex, location, isSource=False, isInstance=False):
+        self.index = index
+        self.columnIndex = columnIndex
+        self.rowIndex = rowIndex
+        self.location = location
+        self.locationKey = makeLocationKey(location)
+        self.isSource = isSource
+        self.isInstance = isInstance
+        self.processedGlyphNames = None
+        self.glyphNames = None
+        self.glyphPairs = set()
+        self.glyph = None
+        self.kerning = None
+        self.width = None
+        self.unitsPerEm = None
+        self.descender = None
+        self.scale = None
+        self.kinks = None
+        self.position = None
+        self.size = None
+        self.glyphPosition = None
+
+
+class SpaceRangerGrid:
+
+    """
+    Compute the contents of a Space Ranger grid.
+
+    - `ufoOperator` The operator for the designspace.
+    - `settings` A settings dict. The keys and default
+      values are in `defaultGridSettings`. The dict is
+      not copied, so a controller can share its settings.
+
+    The work is split into three steps that mirror what
+    can change in the user interface:
+
+    1. `buildCells` makes the locations.
+    2. `prepareCells` processes the glyph names.
+    3. `updateCells` compiles and lays out the cells.
+       `iterateUpdateCells` does the same thing in
+       batches so that the cells can be drawn as they
+       are finished.
+
+    `visibleRect` is an optional (x, y, width, height)
+    rect in grid coordinates. The cells in it are
+    compiled before the others.
+    """
+
+    def __init__(self, ufoOperator, settings=None):
+        if settings is None:
+            settings = {}
+        for key, value in defaultGridSettings.items():
+            if key not in settings:
+                settings[key] = value
+        self.ufoOperator = ufoOperator
+        self.settings = settings
+        self.glyphCache = InterpolatedGlyphCache()
+        self.variationModels = GlyphVariationModels(ufoOperator)
+        self.kerningEvaluator = None
+        self.metricsEvaluator = None
+        self.ruleSubstitutions = None
+        self.locationIndex = None
+        self.incompatibleGlyphs = set()
+        self.timer = PhaseTimer()
+        self.cells = []
+        self.sources = {}
+        self.columnLocations = []
+        self.rowLocations = []
+        self.columnWidths = None
+        self.columnPositions = None
+        self._columnMaximums = None
+        self.width = 0
+        self.height = 0
+        self.visibleRect = None
+        self._kinkModel = None
+        self._kinkModelKey = None
+        self._kinkModelGlyphNames = None
+        self.cancelToken = None
+        self._interruptedCells = set()
+        self._layoutInterrupted = False
+        self._fullUpdateInterrupted = False
+
+    # Caches
+
+    def clearCaches(self):
+        self.glyphCache.clear()
+        self.variationModels.clear()
+        self.kerningEvaluator = None
+        self.metricsEvaluator = None
+        self.ruleSubstitutions = None
+        self.locationIndex = None
+        self._kinkModel = None
+        self._kinkModelKey = None
+
+    def invalidateLocations(self):
+        """
+        Forget the source and instance locations. This
+        must be called when the designspace instances
+        change. The cells must be built again after this.
+        """
+        self.locationIndex = None
+
+    def invalidateRules(self):
+        """
+        Forget the rule substitutions. This must be
+        called when the designspace rules change.
+        """
+        self.ruleSubstitutions = None
+
+    def invalidateGlyphNames(self, glyphNames, defaultGlyphNames=None):
+        """
+        Remove `glyphNames` and any glyphs that use them
+        as components from the caches. This returns the
+        set of invalidated glyph names.
+
+        `defaultGlyphNames` are the glyphs in `glyphNames`
+        that changed in the default source. If this is
+        None, all of `glyphNames` are assumed to have.
+        """
+        if defaultGlyphNames is None:
+            defaultGlyphNames = glyphNames
+        self.invalidateKinkModel(defaultGlyphNames)
+        # all dependents are found, even if they aren't in
+        # the glyph cache, because their variation models
+        # may still be cached.
+        glyphNames = set(glyphNames)
+        toCheck = list(glyphNames)
+        while toCheck:
+            glyphName = toCheck.pop()
+            dependencies = self.ufoOperator.getGlyphDependencies(glyphName)
+            if not dependencies:
+                continue
+            for dependency in dependencies:
+                if dependency not in glyphNames:
+                    glyphNames.add(dependency)
+                    toCheck.append(dependency)
+        self.glyphCache.invalidateGlyphNames(glyphNames)
+        self.variationModels.invalidateGlyphNames(glyphNames)
+        return glyphNames
+
+    def reloadKerning(self):
+        """
+        Reread the kerning values from the sources.
+        This returns the set of glyph pairs that changed.
+        """
+        if self.kerningEvaluator is None:
+            return set()
+        return self.kerningEvaluator.reload()
+
+    def reloadVerticalMetrics(self):
+        """
+        Reread the vertical metrics from the source font
+        info. This returns True if they changed.
+        """
+        if self.metricsEvaluator is None:
+            return False
+        return self.metricsEvaluator.reload()
+
+    # Cells
+
+    @timedPhase("locations")
+    def buildCells(self):
+        """
+        Make the cells for the current axis settings.
+        """
+        ufoOperator = self.ufoOperator
+        settings = self.settings
+        discreteLocation = settings["discreteLocation"]
+        xAxisName = settings["xAxisName"]
+        xAxisReverse = settings["xAxisReverse"]
+        yAxisName = settings["yAxisName"]
+        yAxisReverse = settings["yAxisReverse"]
+        insertSources = settings["insertSources"]
+        insertInstances = settings["insertInstances"]
+        # establish the values for unchosen axes
+        defaultAxes = {}
+        for axis in ufoOperator.getOrderedContinuousAxes():
+            if axis.name in (xAxisName, yAxisName):
+                continue
+            defaultAxes[axis.name] = axis.default
+        baseLocation = {}
+        if discreteLocation:
+            baseLocation.update(discreteLocation)
+        baseLocation.update(defaultAxes)
+        # the source and instance locations are only
+        # read again after the designspace changes.
+        if self.locationIndex is None:
+            self.locationIndex = LocationIndex(ufoOperator)
+        locationIndex = self.locationIndex
+        # column count
+        sortColumnLocations = False
+        if settings["xAxisMode"] == "locations":
+            columnLocations = list(settings["xAxisLocations"])
+        elif settings["xAxisMode"] == "instances":
+            columnLocations = list(
+                locationIndex.getInstanceAxisLocations(xAxisName, discreteLocation)
+            )
+        else:
+            columnLocations = self._makeAxisSteps(xAxisName, settings["xAxisCount"])
+        # row count
+        sortRowLocations = False
+        if not yAxisName:
+            rowLocations = [0]
+        elif settings["yAxisMode"] == "instances":
+            rowLocations = list(
+                locationIndex.getInstanceAxisLocations(yAxisName, discreteLocation)
+            )
+        else:
+            if settings["yAxisMode"] == "locations":
+                rowLocations = list(settings["yAxisLocations"])
+            else:
+                rowLocations = self._makeAxisSteps(yAxisName, settings["yAxisCount"])
+        # the axis values are compared after rounding
+        # so that float noise doesn't make new columns.
+        columnKeys = set(roundLocationValue(value) for value in columnLocations)
+        rowKeys = set(roundLocationValue(value) for value in rowLocations)
+        # insert instances
+        if insertInstances:
+            for location in locationIndex.instanceLocations:
+                columnLocation = location[xAxisName]
+                if roundLocationValue(columnLocation) not in columnKeys:
+                    columnLocations.append(columnLocation)
+                    columnKeys.add(roundLocationValue(columnLocation))
+                    sortColumnLocations = True
+                if yAxisName:
+                    rowLocation = location[yAxisName]
+                    if roundLocationValue(rowLocation) not in rowKeys:
+                        rowLocations.append(rowLocation)
+                        rowKeys.add(roundLocationValue(rowLocation))
+                        sortRowLocations = True
+        instanceLocationKeys = locationIndex.instanceLocationKeys
+        # sources
+        sources = {}
+        for source, location, locationKey in locationIndex.getSources(discreteLocation):
+            # layer sources share a location with their font.
+            # the source with the full font is preferred.
+            if locationKey not in sources or source.layerName is None:
+                sources[locationKey] = source
+            if insertSources:
+                columnLocation = location[xAxisName]
+                if roundLocationValue(columnLocation) not in columnKeys:
+                    columnLocations.append(columnLocation)
+                    columnKeys.add(roundLocationValue(columnLocation))
+                    sortColumnLocations = True
+                if yAxisName:
+                    rowLocation = location[yAxisName]
+                    if roundLocationValue(rowLocation) not in rowKeys:
+                        rowLocations.append(rowLocation)
+                        rowKeys.add(roundLocationValue(rowLocation))
+                        sortRowLocations = True
+        if sortColumnLocations:
+            columnLocations.sort()
+        if sortRowLocations:
+            rowLocations.sort()
+        if xAxisReverse:
+            columnLocations.reverse()
+        if yAxisReverse:
+            rowLocations.reverse()
+        # make the cells
+        cells = []
+        for columnIndex, columnLocation in enumerate(columnLocations):
+            for rowIndex, rowLocation in enumerate(rowLocations):
+                location = dict(baseLocation)
+                location[xAxisName] = columnLocation
+                if yAxisName is not None:
+                    location[yAxisName] = rowLocation
+                cell = GridCell(
+                    index=len(cells),
+                    columnIndex=columnIndex,
+                    rowIndex=rowIndex,
+                    location=location
+                )
+                cell.isSource = cell.locationKey in sources
+                cell.isInstance = cell.locationKey in instanceLocationKeys
+                cells.append(cell)
+        self.cells = cells
+        self.sources = sources
+        self.columnLocations = columnLocations
+        self.rowLocations = rowLocations
+        self.columnWidths = None
+        self.columnPositions = None
+        self._columnMaximums = None
+        return cells
+
+    def _makeAxisSteps(self, axisName, steps):
+        axis = self.ufoOperator.getAxis(axisName)
+        # the values will be in user space.
+        # convert them to design space.
+        axisMinimum = axis.map_forward(axis.minimum)
+        axisMaximum = axis.map_forward(axis.maximum)
+        locations = []
+        step = (axisMaximum - axisMinimum) / (steps - 1)
+        for i in range(steps):
+            location = axisMinimum + (i * step)
+            locations.append(location)
+        return locations
+
+    def getCellsInRect(self, rect):
+        """
+        Get the cells that intersect the (x, y, width, height)
+        `rect`. The rows and columns are found from the
+        layout, so the cells outside of `rect` aren't checked.
+        """
+        columnWidths = self.columnWidths
+        columnPositions = self.columnPositions
+        if not columnPositions or not self.cells:
+            return []
+        x, y, width, height = rect
+        rowCount = self.getRowCount()
+        # rows are counted from the bottom
+        rowStep = itemHeight + itemSpacing
+        firstRow = max(0, math.ceil((y - gridInset - itemHeight) / rowStep))
+        lastRow = min(rowCount - 1, math.floor((y + height - gridInset) / rowStep))
+        rowIndexes = [rowCount - row - 1 for row in range(firstRow, lastRow + 1)]
+        firstColumn = max(0, bisect.bisect_right(columnPositions, x) - 1)
+        cells = []
+        for columnIndex in range(firstColumn, len(columnPositions)):
+            left = columnPositions[columnIndex]
+            if left > x + width:
+                break
+            if left + columnWidths[columnIndex] >= x:
+                for rowIndex in rowIndexes:
+                    cells.append(self.getCell(columnIndex, rowIndex))
+        return cells
+
+    def getCellAtPoint(self, point):
+        """
+        Get the cell containing the (x, y) `point`
+        or None if the point isn't in a cell. This
+        is calculated from the layout.
+        """
+        columnWidths = self.columnWidths
+        columnPositions = self.columnPositions
+        if not columnPositions or not self.cells:
+            return None
+        x, y = point
+        columnIndex = bisect.bisect_right(columnPositions, x) - 1
+        if columnIndex < 0:
+            return None
+        if x > columnPositions[columnIndex] + columnWidths[columnIndex]:
+            # between the columns
+            return None
+        rowStep = itemHeight + itemSpacing
+        row, rowOffset = divmod(y - gridInset, rowStep)
+        row = int(row)
+        rowCount = self.getRowCount()
+        if not 0 <= row < rowCount:
+            return None
+        if rowOffset > itemHeight:
+            # between the rows
+            return None
+        # rows are counted from the bottom
+        return self.getCell(columnIndex, rowCount - row - 1)
+
+    def getCell(self, columnIndex, rowIndex):
+        """
+        Get the cell at `columnIndex` and `rowIndex`
+        or None if the grid doesn't have it.
+        """
+        rowCount = self.getRowCount()
+        if not 0 <= columnIndex < self.getColumnCount():
+            return None
+        if not 0 <= rowIndex < rowCount:
+            return None
+        return self.cells[(columnIndex * rowCount) + rowIndex]
+
+    def getColumnCount(self):
+        return len(self.columnLocations)
+
+    def getRowCount(self):
+        return len(self.rowLocations)
+
+    # Glyph Names
+
+    @timedPhase("glyphNames")
+    def prepareCells(self):
+        """
+        Process the glyph names for each cell. This
+        returns the set of all glyph names in the grid.
+        """
+        allGlyphNames = set()
+        for cell in self.cells:
+            self._processCellGlyphNames(cell)
+            allGlyphNames |= cell.glyphNames
+            # force the cell to be compiled
+            cell.glyph = None
+        return allGlyphNames
+
+    @timedPhase("sourceGlyphs")
+    def collectSourceGlyphs(self, glyphNames):
+        """
+        Get the source glyph objects for `glyphNames`
+        in the current discrete location.
+        """
+        discreteLocation = self.settings["discreteLocation"]
+        sourceGlyphs = []
+        for glyphName in glyphNames:
+            sources, unicodes = self.ufoOperator.collectSourcesForGlyph(
+                glyphName,
+                discreteLocation=discreteLocation,
+                decomposeComponents=False,
+                asMathGlyph=False
+            )
+            for location, glyph, sourceInfo in sources:
+                sourceGlyphs.append(glyph)
+        return sourceGlyphs
+
+    # Sources
+
+    @timedPhase("sources")
+    def loadSources(self):
+        """
+        Read what the next update needs from the source
+        fonts. The fonts may be edited on the main thread
+        while a worker runs an update, so this must be called
+        on the main thread before the update is given to the
+        worker. The update then only uses the copies in the
+        variation models and the evaluators.
+        """
+        settings = self.settings
+        discreteLocation = settings["discreteLocation"]
+        incompatibleGlyphs = self.incompatibleGlyphs
+        glyphNames = set(settings["glyphNames"])
+        glyphPairs = set()
+        # the processed glyph names are shared by
+        # the cells in the same rule region.
+        processedGlyphNames = {}
+        for cell in self.cells:
+            if cell.processedGlyphNames is None:
+                self._processCellGlyphNames(cell)
+            processedGlyphNames[id(cell.processedGlyphNames)] = cell.processedGlyphNames
+        for names in processedGlyphNames.values():
+            glyphNames.update(names)
+            if settings["applyKerning"]:
+                glyphPairs |= getGlyphPairs(names, incompatibleGlyphs)
+        for glyphName in glyphNames:
+            if glyphName in incompatibleGlyphs:
+                continue
+            self.variationModels.getModel(glyphName, discreteLocation=discreteLocation)
+        if glyphPairs:
+            self._getKerningEvaluator(glyphPairs)
+        self._getMetricsEvaluator()
+
+    # Update
+
+    @timedPhase("updateCells")
+    def updateCells(self, glyphNames=None, kerningPairs=None, cancelToken=None):
+        """
+        Compile and lay out the cells. If `glyphNames` or
+        `kerningPairs` are given, only the cells that
+        depend on those will be recompiled. Otherwise,
+        everything is updated.
+
+        This returns a tuple of (cells, layoutChanged).
+        `cells` are the cells that need to be redrawn.
+        `layoutChanged` indicates if the cell frames and
+        the grid size changed.
+
+        If `cancelToken` is given, it is checked during the
+        update and UpdateCancelled is raised when it has been
+        cancelled. The interrupted work is redone by the
+        next update.
+        """
+        updatedCells = {}
+        layoutChanged = False
+        for frameCells, contentCells, batchLayoutChanged in self.iterateUpdateCells(
+                glyphNames=glyphNames,
+                kerningPairs=kerningPairs,
+                cancelToken=cancelToken,
+                batchSize=None
+            ):
+            layoutChanged = layoutChanged or batchLayoutChanged
+            for cell in frameCells + contentCells:
+                updatedCells[cell.index] = cell
+        updatedCells = [updatedCells[index] for index in sorted(updatedCells)]
+        return updatedCells, layoutChanged
+
+    def iterateUpdateCells(self, glyphNames=None, kerningPairs=None, cancelToken=None, batchSize=defaultCellBatchSize):
+        """
+        Update the cells in batches. The arguments are
+        the same as for `updateCells`.
+
+        The cells are measured and laid out first. After
+        that, the outlines are compiled `batchSize` cells
+        at a time. The cells in `visibleRect` are compiled
+        first. `visibleRect` is checked before each batch,
+        so it may be changed while the update is running.
+
+        This yields a tuple of (frameCells, contentCells,
+        layoutChanged) for each batch:
+
+        - `frameCells` The cells with a new frame or glyph
+          position. This is only given in the first batch.
+        - `contentCells` The cells with new outlines
+          or kinks.
+        - `layoutChanged` Indicates if the cell frames
+          and the grid size changed.
+        """
+        if self._fullUpdateInterrupted:
+            glyphNames = kerningPairs = None
+        fullUpdate = glyphNames is None and kerningPairs is None
+        self.cancelToken = cancelToken
+        dirtyCells = None
+        finished = False
+        try:
+            dirtyCells = self.findDirtyCells(
+                glyphNames=glyphNames,
+                kerningPairs=kerningPairs
+            )
+            self._checkCancelled()
+            cellKerning = self.interpolateKerning(dirtyCells)
+            self._checkCancelled()
+            self.measureCells(dirtyCells, cellKerning, fullUpdate=fullUpdate)
+            self._checkCancelled()
+            layoutChanged = self.measureColumns(
+                dirtyCells,
+                fullUpdate=fullUpdate or self._layoutInterrupted
+            )
+            if layoutChanged:
+                frameCells = list(self.cells)
+            else:
+                frameCells = dirtyCells
+            # only the cells that moved need to be redrawn
+            frameCells = self.layoutCells(
+                frameCells,
+                layoutChanged=layoutChanged,
+                force=fullUpdate
+            )
+            self._checkCancelled()
+            if self.updateKinkModel():
+                # the smooth points changed so
+                # every cell needs to be checked.
+                pendingCells = list(self.cells)
+            else:
+                pendingCells = list(dirtyCells)
+            dirtyIndexes = set(cell.index for cell in dirtyCells)
+            while not finished:
+                self._checkCancelled()
+                contentCells, pendingCells = self._takeNextCells(pendingCells, batchSize)
+                self.compileCells(
+                    [cell for cell in contentCells if cell.index in dirtyIndexes],
+                    fullUpdate=fullUpdate
+                )
+                self._checkCancelled()
+                self.findCellKinks(contentCells)
+                finished = not pendingCells
+                if finished:
+                    self._interruptedCells = set()
+                    self._layoutInterrupted = False
+                    self._fullUpdateInterrupted = False
+                yield frameCells, contentCells, layoutChanged
+                frameCells = []
+                layoutChanged = False
+        except BaseException:
+            # the update was cancelled, the consumer stopped
+            # early or something went wrong. the unfinished
+            # work is redone by the next update.
+            if not finished:
+                if dirtyCells is None:
+                    # the changes weren't matched to cells
+                    # yet, so everything must be redone.
+                    self._fullUpdateInterrupted = True
+                else:
+                    self._interruptedCells.update(cell.index for cell in dirtyCells)
+                self._layoutInterrupted = True
+                self._fullUpdateInterrupted = self._fullUpdateInterrupted or fullUpdate
+            raise
+        finally:
+            self.cancelToken = None
+
+    def _checkCancelled(self):
+        if self.cancelToken is not None:
+            self.cancelToken.check()
+
+    def _takeNextCells(self, cells, batchSize):
+        # split the cells into the next batch and the
+        # rest. all of the visible cells are in the batch.
+        visibleRect = self.visibleRect
+        if visibleRect is not None:
+            visibleCells = []
+            otherCells = []
+            for cell in cells:
+                if cellIntersectsRect(cell, visibleRect):
+                    visibleCells.append(cell)
+                else:
+                    otherCells.append(cell)
+            if visibleCells:
+                return visibleCells, otherCells
+        if batchSize is None:
+            return cells, []
+        return cells[:batchSize], cells[batchSize:]
+
+    # Update Phases
+
+    @timedPhase("dirtyCells")
+    def findDirtyCells(self, glyphNames=None, kerningPairs=None):
+        """
+        Find the cells that need to be recompiled.
+        """
+        fullUpdate = glyphNames is None and kerningPairs is None
+        if glyphNames is None:
+            glyphNames = set()
+        if kerningPairs is None:
+            kerningPairs = set()
+        applyKerning = self.settings["applyKerning"]
+        dirtyCells = []
+        for cell in self.cells:
+            if cell.processedGlyphNames is None:
+                self._processCellGlyphNames(cell)
+            if fullUpdate or cell.glyph is None:
+                dirtyCells.append(cell)
+            elif cell.index in self._interruptedCells:
+                dirtyCells.append(cell)
+            elif not cell.glyphNames.isdisjoint(glyphNames):
+                dirtyCells.append(cell)
+            elif not cell.glyphPairs.isdisjoint(kerningPairs):
+                dirtyCells.append(cell)
+        for cell in dirtyCells:
+            glyphPairs = set()
+            if applyKerning:
+                glyphPairs = getGlyphPairs(cell.processedGlyphNames, self.incompatibleGlyphs)
+            cell.glyphPairs = glyphPairs
+        return dirtyCells
+
+    @timedPhase("kerning")
+    def interpolateKerning(self, cells):
+        """
+        Interpolate the kerning for all `cells` at once.
+        This returns a list of {glyph pair : value} dicts
+        or None for each cell.
+        """
+        if not self.settings["applyKerning"]:
+            self.kerningEvaluator = None
+            return [None for cell in cells]
+        kerningEvaluator = self._getKerningEvaluator()
+        if kerningEvaluator is None:
+            return [None for cell in cells]
+        return kerningEvaluator.evaluate(
+            [cell.location for cell in cells]
+        )
+
+    @timedPhase("measure")
+    def measureCells(self, cells, cellKerning, fullUpdate=False):
+        """
+        Measure the strings in `cells` without building
+        the outlines. The kerning for each cell is stored
+        for `compileCells`.
+        """
+        glyphWidths = self._interpolateCellGlyphWidths(cells)
+        metricsCells = [
+            cell
+            for cell in cells
+            if cell.unitsPerEm is None or fullUpdate
+        ]
+        if metricsCells:
+            metricsEvaluator = self._getMetricsEvaluator()
+            metrics = metricsEvaluator.evaluate([cell.location for cell in metricsCells])
+            for cell, (unitsPerEm, descender) in zip(metricsCells, metrics):
+                cell.unitsPerEm = unitsPerEm
+                cell.descender = descender
+        for cell, kerning in zip(cells, cellKerning):
+            self._checkCancelled()
+            cell.scale = itemPointSize / cell.unitsPerEm
+            cell.kerning = kerning
+            locationKey = cell.locationKey
+            width = 0
+            previousGlyphName = None
+            for glyphName in cell.processedGlyphNames:
+                glyphWidth = glyphWidths.get((glyphName, locationKey))
+                if glyphWidth is None:
+                    continue
+                if kerning and previousGlyphName is not None:
+                    width += kerning.get((previousGlyphName, glyphName), 0)
+                width += glyphWidth
+                previousGlyphName = glyphName
+            cell.width = width
+
+    @timedPhase("compile")
+    def compileCells(self, cells, fullUpdate=False):
+        """
+        Build the glyphs in `cells`. The cells
+        must have been measured.
+        """
+        discreteLocation = self.settings["discreteLocation"]
+        # interpolate the glyphs that aren't cached
+        # for all cells at once
+        self._interpolateCellGlyphs(cells)
+        for cell in cells:
+            self._checkCancelled()
+            cell.glyph = compileGlyph(
+                glyphNames=cell.processedGlyphNames,
+                ufoOperator=self.ufoOperator,
+                location=cell.location,
+                discreteLocation=discreteLocation,
+                incompatibleGlyphs=self.incompatibleGlyphs,
+                kerning=cell.kerning,
+                smooth=False,
+                glyphCache=self.glyphCache,
+                variationModels=self.variationModels
+            )
+            # hash here so that the main thread
+            # can compare the outlines quickly.
+            cell.glyph.getContentHash()
+
+    @timedPhase("columns")
+    def measureColumns(self, cells=None, fullUpdate=False):
+        """
+        Calculate the column widths. Only the columns
+        containing `cells` are measured unless `cells`
+        is None or `fullUpdate` is True. This returns
+        a bool indicating if the widths changed.
+        """
+        columnCount = self.getColumnCount()
+        rowCount = self.getRowCount()
+        columnMaximums = self._columnMaximums
+        if cells is None or fullUpdate or columnMaximums is None:
+            columnMaximums = [0 for i in range(columnCount)]
+            columnIndexes = range(columnCount)
+        else:
+            columnMaximums = list(columnMaximums)
+            columnIndexes = set(cell.columnIndex for cell in cells)
+        for columnIndex in columnIndexes:
+            columnCells = self.cells[columnIndex * rowCount:(columnIndex + 1) * rowCount]
+            columnMaximums[columnIndex] = max(cell.width * cell.scale for cell in columnCells)
+        self._columnMaximums = columnMaximums
+        if self.settings["columnWidthMode"] == "mono":
+            columnWidth = max(columnMaximums)
+            columnWidth += itemPadding * 2
+            columnWidths = [columnWidth for i in columnMaximums]
+        else:
+            columnWidths = [columnWidth + (itemPadding * 2) for columnWidth in columnMaximums]
+        # only lay out the grid if a column changed
+        layoutChanged = fullUpdate or columnWidths != self.columnWidths
+        if layoutChanged:
+            # the left edge of each column
+            columnPositions = []
+            x = gridInset
+            for columnWidth in columnWidths:
+                columnPositions.append(x)
+                x += columnWidth + itemSpacing
+            self.columnPositions = columnPositions
+        self.columnWidths = columnWidths
+        return layoutChanged
+
+    @timedPhase("kinkModel")
+    def updateKinkModel(self):
+        """
+        Rebuild the kink model from the default if the
+        text, discrete location, smoothing setting or
+        incompatible glyphs changed or if it has been
+        invalidated. This returns a bool indicating if
+        the smooth points in the default changed, in which
+        case all cells need to be checked.
+        """
+        settings = self.settings
+        discreteLocation = settings["discreteLocation"]
+        autoSmoothDefault = settings["autoSmoothDefault"]
+        if not settings["highlightKinks"]:
+            self._kinkModel = None
+            self._kinkModelKey = None
+            return False
+        glyphNames = settings["glyphNames"]
+        key = (
+            tuple(glyphNames),
+            makeLocationKey(discreteLocation),
+            autoSmoothDefault,
+            frozenset(self.incompatibleGlyphs.intersection(glyphNames))
+        )
+        if self._kinkModel is not None and key == self._kinkModelKey:
+            return False
+        defaultLocation = self.ufoOperator.newDefaultLocation(discreteLocation=discreteLocation)
+        model = compileGlyph(
+            glyphNames=glyphNames,
+            ufoOperator=self.ufoOperator,
+            location=defaultLocation,
+            discreteLocation=discreteLocation,
+            incompatibleGlyphs=self.incompatibleGlyphs,
+            smooth=autoSmoothDefault,
+            glyphCache=self.glyphCache,
+            variationModels=self.variationModels
+        )
+        kinkModel = KinkModel(model)
+        previousKinkModel = self._kinkModel
+        smoothsChanged = False
+        if previousKinkModel is not None:
+            if not previousKinkModel.isCompatible(model) or previousKinkModel.pointIndexes.tolist() != kinkModel.pointIndexes.tolist():
+                smoothsChanged = True
+        self._kinkModel = kinkModel
+        self._kinkModelKey = key
+        self._kinkModelGlyphNames = set(glyphNames)
+        return smoothsChanged
+
+    def invalidateKinkModel(self, glyphNames):
+        """
+        Tell the grid that the default location sources
+        of `glyphNames` changed. The kink model will be
+        rebuilt if it uses any of them directly or
+        as components.
+        """
+        if self._kinkModelKey is None:
+            return
+        modelGlyphNames = self._kinkModelGlyphNames
+        glyphNames = set(glyphNames)
+        toCheck = list(glyphNames)
+        while toCheck:
+            glyphName = toCheck.pop()
+            if glyphName in modelGlyphNames:
+                # the previous model is kept to find out
+                # if the smooth points changed.
+                self._kinkModelKey = None
+                return
+            dependencies = self.ufoOperator.getGlyphDependencies(glyphName)
+            if not dependencies:
+                continue
+            for dependency in dependencies:
+                if dependency not in glyphNames:
+                    glyphNames.add(dependency)
+                    toCheck.append(dependency)
+
+    @timedPhase("kinks")
+    def findCellKinks(self, cells):
+        """
+        Find the kinks in all of `cells` at once
+        with the model from `updateKinkModel`.
+        """
+        checkSourceKinks = self.settings["highlightSourceKinks"]
+        kinkModel = self._kinkModel
+        kinkCells = []
+        for cell in cells:
+            cell.kinks = None
+            if kinkModel is None:
+                continue
+            if cell.isSource and not checkSourceKinks:
+                continue
+            if not kinkModel.isCompatible(cell.glyph):
+                continue
+            kinkCells.append(cell)
+        kinks = findKinks([cell.glyph for cell in kinkCells], kinkModel)
+        for cell, cellKinks in zip(kinkCells, kinks):
+            cell.kinks = cellKinks
+
+    @timedPhase("layout")
+    def layoutCells(self, cells, layoutChanged=True, force=False):
+        """
+        Position `cells` and, if `layoutChanged`,
+        measure the grid. This returns the cells
+        with a new frame or glyph position. If
+        `force` is True, all of `cells` are returned.
+        """
+        columnWidths = self.columnWidths
+        columnPositions = self.columnPositions
+        rowCount = self.getRowCount()
+        changedCells = []
+        for cell in cells:
+            columnIndex = cell.columnIndex
+            columnWidth = columnWidths[columnIndex]
+            position = cell.position
+            size = cell.size
+            if layoutChanged:
+                # the view coordinates start at the bottom,
+                # so flip the row index to calculate the
+                # visually proper y location.
+                rowIndex = rowCount - cell.rowIndex - 1
+                x = columnPositions[columnIndex]
+                y = gridInset
+                y += itemHeight * rowIndex
+                y += itemSpacing * rowIndex
+                position = (x, y)
+                size = (columnWidth, itemHeight)
+            x = (columnWidth - (cell.width * cell.scale)) / 2
+            y = itemPadding
+            y += -cell.descender * cell.scale
+            glyphPosition = (x, y)
+            if force or position != cell.position or size != cell.size or glyphPosition != cell.glyphPosition:
+                changedCells.append(cell)
+            cell.position = position
+            cell.size = size
+            cell.glyphPosition = glyphPosition
+        # measure the grid
+        if layoutChanged:
+            width = gridInset * 2
+            width += sum(columnWidths)
+            width += itemSpacing * (len(columnWidths) - 1)
+            height = gridInset * 2
+            height += itemHeight * rowCount
+            height += itemSpacing * (rowCount - 1)
+            self.width = width
+            self.height = height
+        return changedCells
+
+    def _processCellGlyphNames(self, cell):
+        settings = self.settings
+        glyphNames = settings["glyphNames"]
+        if not settings["applyRules"]:
+            processedGlyphNames = glyphNames
+        else:
+            if self.ruleSubstitutions is None:
+                self.ruleSubstitutions = RuleSubstitutions(self.ufoOperator.rules)
+            processedGlyphNames = self.ruleSubstitutions.process(cell.location, glyphNames)
+        cell.processedGlyphNames = processedGlyphNames
+        cell.glyphNames = set(processedGlyphNames)
+
+    def _getKerningEvaluator(self, glyphPairs=None):
+        # the evaluator is rebuilt only when the
+        # needed glyph pairs or discrete location change.
+        discreteLocation = self.settings["discreteLocation"]
+        if glyphPairs is None:
+            glyphPairs = set()
+            for cell in self.cells:
+                if cell.glyphPairs:
+                    glyphPairs |= cell.glyphPairs
+        if not glyphPairs:
+            self.kerningEvaluator = None
+            return None
+        kerningEvaluator = self.kerningEvaluator
+        if kerningEvaluator is not None:
+            if kerningEvaluator.discreteLocation != discreteLocation:
+                kerningEvaluator = None
+            elif not glyphPairs.issubset(kerningEvaluator.glyphPairs):
+                kerningEvaluator = None
+        if kerningEvaluator is None:
+            kerningEvaluator = KerningEvaluator(
+                ufoOperator=self.ufoOperator,
+                glyphPairs=glyphPairs,
+                discreteLocation=discreteLocation
+            )
+            self.kerningEvaluator = kerningEvaluator
+        return kerningEvaluator
+
+    def _getMetricsEvaluator(self):
+        discreteLocation = self.settings["discreteLocation"]
+        metricsEvaluator = self.metricsEvaluator
+        if metricsEvaluator is not None:
+            if metricsEvaluator.discreteLocation != discreteLocation:
+                metricsEvaluator = None
+        if metricsEvaluator is None:
+            metricsEvaluator = VerticalMetricsEvaluator(
+                ufoOperator=self.ufoOperator,
+                discreteLocation=discreteLocation
+            )
+            self.metricsEvaluator = metricsEvaluator
+        return metricsEvaluator
+
+    def _interpolateCellGlyphWidths(self, cells):
+        # get the glyph widths without making the glyphs.
+        # this returns a dict of (glyph name, location key)
+        # : width. missing glyphs have a width of None.
+        discreteLocation = self.settings["discreteLocation"]
+        glyphCache = self.glyphCache
+        glyphWidths = {}
+        locationsForGlyphName = {}
+        for cell in cells:
+            location = cell.location
+            if None in location:
+                location = dict(location)
+                del location[None]
+            locationKey = cell.locationKey
+            for glyphName in cell.glyphNames:
+                key = (glyphName, locationKey)
+                if key in glyphWidths:
+                    continue
+                glyphWidths[key] = None
+                if glyphName in self.incompatibleGlyphs:
+                    continue
+                glyph = glyphCache.get(
+                    glyphName,
+                    location,
+                    discreteLocation=discreteLocation,
+                    fallback=_glyphCacheMiss
+                )
+                if glyph is _glyphCacheMiss:
+                    if glyphName not in locationsForGlyphName:
+                        locationsForGlyphName[glyphName] = {}
+                    locationsForGlyphName[glyphName][locationKey] = location
+                elif glyph is not None:
+                    glyphWidths[key] = glyph.width
+        for glyphName, locations in locationsForGlyphName.items():
+            self._checkCancelled()
+            model = self.variationModels.getModel(glyphName, discreteLocation=discreteLocation)
+            if model.compatible:
+                widths = model.interpolateWidths(list(locations.values()))
+                for locationKey, width in zip(locations.keys(), widths):
+                    glyphWidths[glyphName, locationKey] = float(width)
+                continue
+            # the glyph has to be made to
+            # get the width, so keep it.
+            glyphs = interpolateGlyphs(
+                glyphName=glyphName,
+                ufoOperator=self.ufoOperator,
+                variationModels=self.variationModels,
+                locations=list(locations.values()),
+                discreteLocation=discreteLocation
+            )
+            for (locationKey, location), glyph in zip(locations.items(), glyphs):
+                glyphCache.set(
+                    glyphName,
+                    location,
+                    glyph,
+                    discreteLocation=discreteLocation
+                )
+                if glyph is not None:
+                    glyphWidths[glyphName, locationKey] = glyph.width
+        return glyphWidths
+
+    def _interpolateCellGlyphs(self, cells):
+        discreteLocation = self.settings["discreteLocation"]
+        glyphCache = self.glyphCache
+        locationsForGlyphName = {}
+        for cell in cells:
+            location = cell.location
+            if None in location:
+                location = dict(location)
+                del location[None]
+            for glyphName in cell.glyphNames:
+                if glyphName in self.incompatibleGlyphs:
+                    continue
+                glyph = glyphCache.get(
+                    glyphName,
+                    location,
+                    discreteLocation=discreteLocation,
+                    fallback=_glyphCacheMiss
+                )
+                if glyph is not _glyphCacheMiss:
+                    continue
+                if glyphName not in locationsForGlyphName:
+                    locationsForGlyphName[glyphName] = {}
+                locationsForGlyphName[glyphName][cell.locationKey] = location
+        for glyphName, locations in locationsForGlyphName.items():
+            self._checkCancelled()
+            locations = list(locations.values())
+            glyphs = interpolateGlyphs(
+                glyphName=glyphName,
+                ufoOperator=self.ufoOperator,
+                variationModels=self.variationModels,
+                locations=locations,
+                discreteLocation=discreteLocation
+            )
+            for location, glyph in zip(locations, glyphs):
+                glyphCache.set(
+                    glyphName,
+                    location,
+                    glyph,
+                    discreteLocation=discreteLocation
+                )
+
+def cellIntersectsRect(cell, rect):
+    """
+    Determine if the frame of `cell` intersects
+    the (x, y, width, height) `rect`.
+    """
+    if cell.position is None:
+        return False
+    x, y = cell.position
+    w, h = cell.size
+    rectX, rectY, rectWidth, rectHeight = rect
+    if x > rectX + rectWidth or x + w < rectX:
+        return False
+    if y > rectY + rectHeight or y + h < rectY:
+        return False
+    return True
+
+# -----------
+# Glyph Names
+# -----------
+
+def processGlyphNames(unprocessedGlyphNames, availableGlyphNames, currentGlyphName="", suffix="_none_"):
+    """
+    Replace "/?" with `currentGlyphName` and apply
+    `suffix` to the glyph names. `suffix` may be
+    "_none_", "_auto_" or a suffix.
+    """
+    replacements = {"/?" : currentGlyphName}
+    glyphNames = [replacements.get(i, i) for i in unprocessedGlyphNames]
+    suffixToApply = None
+    if suffix == "_none_":
+        suffixToApply = None
+    elif suffix == "_auto_":
+        suffixToApply = splitSuffix(currentGlyphName)
+    else:
+        suffixToApply = suffix
+    if suffixToApply:
+        suffixedGlyphNames = []
+        for glyphName in glyphNames:
+            t = glyphName + "." + suffixToApply
+            if t in availableGlyphNames:
+                glyphName = t
+            suffixedGlyphNames.append(glyphName)
+        glyphNames = suffixedGlyphNames
+    return glyphNames
+
+def splitSuffix(glyphName):
+    if "." not in glyphName:
+        return None
+    if glyphName.startswith("."):
+        return None
+    base, suffix  = glyphName.split(".", 1)
+    suffix = suffix.strip()
+    if not suffix:
+        return None
+    return suffix
+
+# ---------
+# Compiling
+# ---------
+
+_glyphCacheMiss = object()
+
+def compileGlyph(
+        glyphNames,
+        ufoOperator,
+        location,
+        discreteLocation=None,
+        incompatibleGlyphs=[],
+        kerning=None,
+        smooth=False,
+        glyphCache=None,
+        variationModels=None
+    ):
+    # remove bogus y axis value
+    if None in location:
+        location = dict(location)
+        del location[None]
+    # interpolate each unique glyph name once. strings
+    # tend to repeat glyphs ("nnonnoo") so the result
+    # is reused for every occurrence in the string.
+    glyphs = {}
+    for glyphName in glyphNames:
+        if glyphName in glyphs:
+            continue
+        glyph = None
+        if glyphName not in incompatibleGlyphs:
+            glyph = _glyphCacheMiss
+            if glyphCache is not None:
+                glyph = glyphCache.get(
+                    glyphName,
+                    location,
+                    discreteLocation=discreteLocation,
+                    smooth=smooth,
+                    fallback=_glyphCacheMiss
+                )
+            if glyph is _glyphCacheMiss:
+                if variationModels is not None:
+                    glyph = interpolateGlyphs(
+                        glyphName=glyphName,
+                        ufoOperator=ufoOperator,
+                        variationModels=variationModels,
+                        locations=[location],
+                        discreteLocation=discreteLocation,
+                        smooth=smooth
+                    )[0]
+                else:
+                    glyph = interpolateGlyph(
+                        glyphName=glyphName,
+                        ufoOperator=ufoOperator,
+                        location=location,
+                        smooth=smooth
+                    )
+                if glyphCache is not None:
+                    glyphCache.set(
+                        glyphName,
+                        location,
+                        glyph,
+                        discreteLocation=discreteLocation,
+                        smooth=smooth
+                    )
+        glyphs[glyphName] = glyph
+    width = 0
+    placedGlyphs = []
+    offsets = []
+    previousGlyphName = None
+    for glyphName in glyphNames:
+        glyph = glyphs[glyphName]
+        if glyph is None:
+            continue
+        kern = 0
+        if kerning and previousGlyphName is not None:
+            kern = kerning.get((previousGlyphName, glyphName), 0)
+        placedGlyphs.append(glyph)
+        offsets.append(width + kern)
+        width += kern + glyph.width
+        previousGlyphName = glyphName
+    return joinCompiledGlyphs(placedGlyphs, offsets, width=width)
+
+def interpolateGlyph(
+        glyphName,
+        ufoOperator,
+        location,
+        smooth=False
+    ):
+    # use the same model as the variation models
+    mathGlyph = ufoOperator.makeOneGlyph(
+        glyphName=glyphName,
+        location=location,
+        useVarlib=ufoOperator.useVarlib
+    )
+    if mathGlyph is None:
+        # operator couldn't make the glyph.
+        # skip quietly because it's probably
+        # bogus user input like asking for
+        # a character that isn't in the fonts.
+        return None
+    return compileGlyphFromPoints(mathGlyph, smooth=smooth)
+
+def interpolateGlyphs(
+        glyphName,
+        ufoOperator,
+        variationModels,
+        locations,
+        discreteLocation=None,
+        smooth=False
+    ):
+    # evaluate the glyph's variation model at all
+    # locations with one matrix product. fall back
+    # to the operator's model, one location at a time,
+    # if the sources are incompatible.
+    model = variationModels.getModel(glyphName, discreteLocation=discreteLocation)
+    if not model.compatible:
+        return [
+            None if mathGlyph is None else compileGlyphFromPoints(mathGlyph, smooth=smooth)
+            for mathGlyph in model.makeFallbackGlyphs(locations)
+        ]
+    glyphs = model.makeGlyphs(locations)
+    if smooth:
+        glyphs = [compileGlyphFromPoints(glyph, smooth=True) for glyph in glyphs]
+    return glyphs
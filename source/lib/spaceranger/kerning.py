@@ -0,0 +1,113 @@
+import numpy
+from .variations import SourceWeights
+
+class KerningEvaluator:
+
+    """
+    Interpolate the kerning values of a fixed set of
+    glyph pairs for any number of locations at once.
+
+    - `ufoOperator` The operator to pull sources from.
+    - `glyphPairs` The glyph pairs to evaluate. Groups
+      are resolved in each source.
+    - `discreteLocation` The discrete location.
+
+    The groups are resolved the way the operator's
+    kerning class does (group/glyph exceptions win over
+    glyph/group exceptions) and the sources are weighted
+    by the operator's own model, so the values match
+    `ufoOperator.makeOneKerning`.
+    """
+
+    def __init__(self, ufoOperator, glyphPairs, discreteLocation=None):
+        self.ufoOperator = ufoOperator
+        self.discreteLocation = discreteLocation
+        self.glyphPairs = list(glyphPairs)
+        self.sourceWeights = None
+        self.masters = None
+        self.sourceFonts = []
+        sourceLocations = []
+        if discreteLocation is not None:
+            sources = ufoOperator.findSourceDescriptorsForDiscreteLocation(discreteLocation)
+        else:
+            sources = ufoOperator.sources
+        for source in sources:
+            # only foreground layers contribute kerning
+            if source.layerName is not None:
+                continue
+            if source.muteKerning:
+                continue
+            font = ufoOperator.fonts.get(source.name)
+            if font is None:
+                continue
+            continuous, discrete = ufoOperator.splitLocation(source.location)
+            sourceLocations.append(continuous)
+            self.sourceFonts.append(font)
+        if not self.sourceFonts or not self.glyphPairs:
+            return
+        sourceWeights = SourceWeights(
+            ufoOperator,
+            sourceLocations,
+            discreteLocation=discreteLocation
+        )
+        if sourceWeights.mutator is None:
+            return
+        self.sourceWeights = sourceWeights
+        self.masters = self._readSourceValues()
+
+    def _readSourceValues(self):
+        values = numpy.zeros((len(self.sourceFonts), len(self.glyphPairs)), dtype=float)
+        mathKerningClass = self.ufoOperator.mathKerningClass
+        for sourceIndex, font in enumerate(self.sourceFonts):
+            kerning = mathKerningClass(font.kerning, font.groups)
+            for pairIndex, pair in enumerate(self.glyphPairs):
+                values[sourceIndex, pairIndex] = kerning[pair]
+        return values
+
+    def reload(self):
+        """
+        Reread the pair values from the sources. This
+        returns the set of glyph pairs whose value
+        changed in at least one source.
+        """
+        if self.sourceWeights is None:
+            return set()
+        masters = self._readSourceValues()
+        changed = (masters != self.masters).any(axis=0)
+        if not changed.any():
+            return set()
+        self.masters = masters
+        return set(
+            pair
+            for pair, pairChanged in zip(self.glyphPairs, changed)
+            if pairChanged
+        )
+
+    def evaluate(self, locations):
+        """
+        Evaluate the kerning at all `locations` at once.
+        This returns a list of {glyph pair : value} dicts.
+        """
+        if self.sourceWeights is None:
+            return [{} for location in locations]
+        values = self.sourceWeights.getWeights(locations) @ self.masters
+        glyphPairs = self.glyphPairs
+        return [
+            dict(zip(glyphPairs, row.tolist()))
+            for row in values
+        ]
+
+
+def getGlyphPairs(glyphNames, incompatibleGlyphs=()):
+    """
+    Get the set of adjacent glyph pairs in `glyphNames`.
+    """
+    pairs = set()
+    previousGlyphName = None
+    for glyphName in glyphNames:
+        if glyphName in incompatibleGlyphs:
+            continue
+        if previousGlyphName is not None:
+            pairs.add((previousGlyphName, glyphName))
+        previousGlyphName = glyphName
+    return pairs
@@ -0,0 +1,135 @@
+import numpy
+from .outlines import (
+    offCurvePointType,
+    linePointType,
+    curvePointType
+)
+
+smoothToleranceBase = 0.05
+smoothThresholdBase = 2
+
+# ----------
+# Kink Model
+# ----------
+
+class KinkModel:
+
+    """
+    The smooth points of the default model that will be
+    checked for kinks. The point indexes and the indexes
+    of the points before and after them are stored as
+    integer arrays.
+    """
+
+    def __init__(self, glyph):
+        self.contourEnds = glyph.contourEnds
+        pointTypes = glyph.pointTypes.tolist()
+        smooths = glyph.smooths.tolist()
+        contourEnds = glyph.contourEnds.tolist()
+        pointIndexes = []
+        previousIndexes = []
+        nextIndexes = []
+        contourStart = 0
+        for contourEnd in contourEnds:
+            contourLength = contourEnd - contourStart + 1
+            for pointIndex in range(contourStart, contourEnd + 1):
+                if not smooths[pointIndex]:
+                    continue
+                pointType = pointTypes[pointIndex]
+                if pointType not in (curvePointType, linePointType):
+                    continue
+                relativeIndex = pointIndex - contourStart
+                previousIndex = contourStart + ((relativeIndex - 1) % contourLength)
+                nextIndex = contourStart + ((relativeIndex + 1) % contourLength)
+                # find the type of the next segment
+                nextPointType = None
+                for i in range(1, contourLength + 1):
+                    t = pointTypes[contourStart + ((relativeIndex + i) % contourLength)]
+                    if t != offCurvePointType:
+                        nextPointType = t
+                        break
+                if nextPointType not in (curvePointType, linePointType):
+                    continue
+                # this edge case can happen if the contours being
+                # compared have different start points. in that case,
+                # there is a chance that this is now testing the
+                # smooth status of a line-line segment. skip it.
+                if pointType == linePointType and nextPointType == linePointType:
+                    continue
+                pointIndexes.append(pointIndex)
+                previousIndexes.append(previousIndex)
+                nextIndexes.append(nextIndex)
+            contourStart = contourEnd + 1
+        self.pointIndexes = numpy.array(pointIndexes, dtype=int)
+        self.previousIndexes = numpy.array(previousIndexes, dtype=int)
+        self.nextIndexes = numpy.array(nextIndexes, dtype=int)
+
+    def __len__(self):
+        return len(self.pointIndexes)
+
+    def isCompatible(self, glyph):
+        return numpy.array_equal(glyph.contourEnds, self.contourEnds)
+
+
+def calculateKinkIntensities(
+        coordinates,
+        kinkModel,
+        tolerance=smoothToleranceBase,
+        threshold=smoothThresholdBase
+    ):
+    """
+    Calculate the kink intensity of every smooth point in
+    `kinkModel` for a (cells x points x 2) `coordinates`
+    array. This returns a (cells x smooth points) array
+    of values between 0 and 1.
+    """
+    coordinates = numpy.asarray(coordinates, dtype=float)
+    if not len(kinkModel):
+        return numpy.zeros((len(coordinates), 0), dtype=float)
+    previousPoints = coordinates[:, kinkModel.previousIndexes]
+    anchors = coordinates[:, kinkModel.pointIndexes]
+    nextPoints = coordinates[:, kinkModel.nextIndexes]
+    inAngles = calculateAngles(previousPoints, anchors)
+    outAngles = calculateAngles(anchors, nextPoints)
+    diffs = numpy.abs(inAngles - outAngles)
+    diffs[diffs <= tolerance] = 0
+    diffs = numpy.minimum(diffs, threshold)
+    return diffs / threshold
+
+def calculateAngles(points1, points2):
+    widths = points2[..., 0] - points1[..., 0]
+    heights = points2[..., 1] - points1[..., 1]
+    angles = numpy.arctan2(heights, widths) * 180 / numpy.pi
+    rounded = numpy.round(angles, 3)
+    # numpy.round scales the values before rounding, so
+    # a value close to a half can go the other way than
+    # with round(). use round() for those so that the
+    # results are the same as the per-point check.
+    scaled = angles * 1000
+    nearHalf = numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6
+    if nearHalf.any():
+        rounded[nearHalf] = [round(angle, 3) for angle in angles[nearHalf].tolist()]
+    return rounded
+
+def findKinks(glyphs, kinkModel, **kwargs):
+    """
+    Find the kinks in a list of CompiledGlyph objects
+    that all have the structure of `kinkModel`.
+    This returns a list of [(x, y, intensity), ...]
+    lists containing only the points with a kink.
+    """
+    if not glyphs:
+        return []
+    if not len(kinkModel):
+        return [[] for glyph in glyphs]
+    coordinates = numpy.stack([glyph.coordinates for glyph in glyphs])
+    intensities = calculateKinkIntensities(coordinates, kinkModel, **kwargs)
+    anchors = coordinates[:, kinkModel.pointIndexes]
+    kinks = []
+    for cellIntensities, cellAnchors in zip(intensities, anchors):
+        found = cellIntensities.nonzero()[0]
+        kinks.append([
+            (float(cellAnchors[i, 0]), float(cellAnchors[i, 1]), float(cellIntensities[i]))
+            for i in found
+        ])
+    return kinks
@@ -0,0 +1,81 @@
+from .caches import makeLocationKey
+
+class LocationIndex:
+
+    """
+    The source and instance locations of a designspace.
+
+    - `ufoOperator` The operator to read the locations from.
+
+    The full design locations are read once and the
+    per-axis and per-discrete location lookups are kept
+    after their first use. Make a new object when the
+    sources, instances or axes change.
+    """
+
+    def __init__(self, ufoOperator):
+        self.ufoOperator = ufoOperator
+        doc = ufoOperator.doc
+        self.instanceLocations = [
+            instance.getFullDesignLocation(doc)
+            for instance in ufoOperator.instances
+        ]
+        self.instanceLocationKeys = set(
+            makeLocationKey(location)
+            for location in self.instanceLocations
+        )
+        self._instanceAxisLocations = {}
+        self._sources = {}
+
+    def getInstanceAxisLocations(self, axisName, discreteLocation=None):
+        """
+        Get the sorted values on `axisName` of the instances
+        in `discreteLocation`. The result should not be modified.
+        """
+        key = (axisName, makeLocationKey(discreteLocation))
+        axisLocations = self._instanceAxisLocations.get(key)
+        if axisLocations is None:
+            axisLocations = getInstanceLocationsForAxis(
+                self.instanceLocations,
+                axisName,
+                discreteLocation
+            )
+            self._instanceAxisLocations[key] = axisLocations
+        return axisLocations
+
+    def getSources(self, discreteLocation=None):
+        """
+        Get the sources in `discreteLocation`. This returns
+        a list of (source descriptor, full design location,
+        location key). The result should not be modified.
+        """
+        key = makeLocationKey(discreteLocation)
+        sources = self._sources.get(key)
+        if sources is None:
+            ufoOperator = self.ufoOperator
+            doc = ufoOperator.doc
+            sources = []
+            for source in ufoOperator.findSourceDescriptorsForDiscreteLocation(discreteLocation):
+                location = source.getFullDesignLocation(doc)
+                sources.append((source, location, makeLocationKey(location)))
+            self._sources[key] = sources
+        return sources
+
+
+def getInstanceLocationsForAxis(instanceLocations, axisName, discreteLocation):
+    if discreteLocation is None:
+        discreteLocation = {}
+    axisLocations = set()
+    for location in instanceLocations:
+        if location[axisName] in axisLocations:
+            continue
+        matchesDiscreteLocation = True
+        for otherAxisName, value in location.items():
+            if otherAxisName in discreteLocation:
+                if discreteLocation[otherAxisName] != value:
+                    matchesDiscreteLocation = False
+                    break
+        if matchesDiscreteLocation:
+            axisLocations.add(location[axisName])
+    axisLocations = list(sorted(axisLocations))
+    return axisLocations
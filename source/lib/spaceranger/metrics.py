@@ -0,0 +1,109 @@
+import numpy
+from .caches import makeLocationKey
+from .variations import SourceWeights
+
+# the font info attributes needed by the grid
+# and the values used when a source doesn't have one.
+verticalMetricsDefaults = (
+    ("unitsPerEm", 1000),
+    ("descender", 0)
+)
+
+class VerticalMetricsEvaluator:
+
+    """
+    Interpolate the vertical metrics needed by the grid
+    instead of the full font info.
+
+    - `ufoOperator` The operator to pull sources from.
+    - `discreteLocation` The discrete location.
+
+    The sources are weighted by the operator's own model,
+    so the values match `ufoOperator.makeOneInfo`. The
+    results are kept for each location until `reload`
+    finds a change in the source font info.
+    """
+
+    def __init__(self, ufoOperator, discreteLocation=None):
+        self.ufoOperator = ufoOperator
+        self.discreteLocation = discreteLocation
+        self.sourceWeights = None
+        self.sourceInfos = []
+        # the source values and the results made from
+        # them are replaced together so that an update
+        # in progress never sees a mix of old and new.
+        self._values = (None, {})
+        sourceLocations = []
+        if discreteLocation is not None:
+            sources = ufoOperator.findSourceDescriptorsForDiscreteLocation(discreteLocation)
+        else:
+            sources = ufoOperator.sources
+        for source in sources:
+            # only foreground layers contribute info
+            if source.layerName is not None:
+                continue
+            font = ufoOperator.fonts.get(source.name)
+            if font is None:
+                continue
+            continuous, discrete = ufoOperator.splitLocation(source.location)
+            sourceLocations.append(continuous)
+            self.sourceInfos.append(font.info)
+        if not self.sourceInfos:
+            return
+        self._values = (self._readSourceValues(), {})
+        sourceWeights = SourceWeights(
+            ufoOperator,
+            sourceLocations,
+            discreteLocation=discreteLocation
+        )
+        if sourceWeights.mutator is None:
+            return
+        self.sourceWeights = sourceWeights
+
+    def _readSourceValues(self):
+        values = numpy.zeros((len(self.sourceInfos), len(verticalMetricsDefaults)), dtype=float)
+        for sourceIndex, info in enumerate(self.sourceInfos):
+            for valueIndex, (attr, default) in enumerate(verticalMetricsDefaults):
+                value = getattr(info, attr)
+                if value is None:
+                    value = default
+                values[sourceIndex, valueIndex] = value
+        return values
+
+    def reload(self):
+        """
+        Reread the values from the sources. This returns
+        True if any of them changed.
+        """
+        if not self.sourceInfos:
+            return False
+        masters = self._readSourceValues()
+        if (masters == self._values[0]).all():
+            return False
+        self._values = (masters, {})
+        return True
+
+    def evaluate(self, locations):
+        """
+        Get the (unitsPerEm, descender) at all `locations`.
+        This returns a list of tuples.
+        """
+        masters, metrics = self._values
+        keys = [makeLocationKey(location) for location in locations]
+        missing = {}
+        for key, location in zip(keys, locations):
+            if key not in metrics:
+                missing[key] = location
+        if missing:
+            missingKeys = list(missing.keys())
+            missingLocations = list(missing.values())
+            if self.sourceWeights is None:
+                # fall back to the operator
+                for key, location in zip(missingKeys, missingLocations):
+                    info = self.ufoOperator.makeOneInfo(location)
+                    metrics[key] = (info.unitsPerEm, info.descender)
+            else:
+                values = self.sourceWeights.getWeights(missingLocations) @ masters
+                for key, row in zip(missingKeys, values.tolist()):
+                    metrics[key] = tuple(row)
+        return [metrics[key] for key in keys]
@@ -0,0 +1,246 @@
+import hashlib
+import numpy
+from fontTools.pens.pointPen import (
+    AbstractPointPen,
+    PointToSegmentPen,
+    GuessSmoothPointPen
+)
+
+# Point types are stored as small integers.
+
+offCurvePointType = 0
+movePointType = 1
+linePointType = 2
+curvePointType = 3
+qCurvePointType = 4
+
+segmentTypeToPointType = {
+    None: offCurvePointType,
+    "move": movePointType,
+    "line": linePointType,
+    "curve": curvePointType,
+    "qcurve": qCurvePointType
+}
+pointTypeToSegmentType = {v: k for k, v in segmentTypeToPointType.items()}
+
+class CompiledGlyph:
+
+    """
+    A lightweight outline built on flat arrays.
+
+    - `width` The advance width.
+    - `coordinates` A (points x 2) float array.
+    - `pointTypes` A (points) integer array of point types.
+    - `smooths` A (points) bool array.
+    - `contourEnds` A (contours) integer array with the
+      index of the last point in each contour.
+
+    The arrays must not be modified after the glyph is
+    made because the content hash is only calculated once.
+    """
+
+    __slots__ = (
+        "width",
+        "coordinates",
+        "pointTypes",
+        "smooths",
+        "contourEnds",
+        "_contentHash"
+    )
+
+    def __init__(self, width=0, coordinates=None, pointTypes=None, smooths=None, contourEnds=None):
+        if coordinates is None:
+            coordinates = numpy.zeros((0, 2), dtype=float)
+        if pointTypes is None:
+            pointTypes = numpy.zeros(0, dtype=numpy.int8)
+        if smooths is None:
+            smooths = numpy.zeros(0, dtype=bool)
+        if contourEnds is None:
+            contourEnds = numpy.zeros(0, dtype=int)
+        self.width = width
+        self.coordinates = coordinates
+        self.pointTypes = pointTypes
+        self.smooths = smooths
+        self.contourEnds = contourEnds
+        self._contentHash = None
+
+    def getContentHash(self):
+        """
+        Get a hash of the outline. Glyphs that draw
+        the same outline have the same hash. The width
+        and smooth flags are not included.
+        """
+        if self._contentHash is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(numpy.ascontiguousarray(self.coordinates, dtype=float).tobytes())
+            h.update(numpy.ascontiguousarray(self.pointTypes, dtype=numpy.int8).tobytes())
+            h.update(numpy.ascontiguousarray(self.contourEnds, dtype=numpy.int64).tobytes())
+            self._contentHash = h.digest()
+        return self._contentHash
+
+    def drawPoints(self, pointPen):
+        coordinates = self.coordinates.tolist()
+        pointTypes = self.pointTypes.tolist()
+        smooths = self.smooths.tolist()
+        start = 0
+        for end in self.contourEnds.tolist():
+            pointPen.beginPath()
+            for i in range(start, end + 1):
+                pointPen.addPoint(
+                    tuple(coordinates[i]),
+                    segmentType=pointTypeToSegmentType[pointTypes[i]],
+                    smooth=smooths[i]
+                )
+            pointPen.endPath()
+            start = end + 1
+
+    def draw(self, pen):
+        self.drawPoints(PointToSegmentPen(pen))
+
+    def iterateSegments(self):
+        """
+        Iterate over the outline as (pen method name, points)
+        without going through a point pen. The segments
+        are the same as those given to `draw`.
+        """
+        coordinates = [tuple(point) for point in self.coordinates.tolist()]
+        pointTypes = self.pointTypes.tolist()
+        start = 0
+        for end in self.contourEnds.tolist():
+            points = coordinates[start:end + 1]
+            types = pointTypes[start:end + 1]
+            start = end + 1
+            if not points:
+                continue
+            yield from _iterateContourSegments(points, types)
+
+
+def _iterateContourSegments(points, types):
+    if len(points) == 1:
+        # a single point is always an open contour
+        yield ("moveTo", (points[0],))
+        yield ("endPath", ())
+        return
+    if types[0] == movePointType:
+        closed = False
+        yield ("moveTo", (points[0],))
+        points = points[1:]
+        types = types[1:]
+    else:
+        closed = True
+        onCurveIndexes = [i for i, pointType in enumerate(types) if pointType != offCurvePointType]
+        if not onCurveIndexes:
+            # a quadratic contour without on-curve points
+            yield ("qCurveTo", tuple(points) + (None,))
+            yield ("closePath", ())
+            return
+        # start after the first on-curve point
+        # so that the contour ends on it.
+        first = onCurveIndexes[0] + 1
+        points = points[first:] + points[:first]
+        types = types[first:] + types[:first]
+        yield ("moveTo", (points[-1],))
+    segmentCount = sum(1 for pointType in types if pointType != offCurvePointType)
+    segmentIndex = 0
+    lastPoint = points[-1] if closed else None
+    segmentPoints = []
+    for point, pointType in zip(points, types):
+        segmentPoints.append(point)
+        if pointType == offCurvePointType:
+            continue
+        segmentIndex += 1
+        if pointType == linePointType:
+            # the closing line is implied unless it
+            # goes to a point on top of the start.
+            if not closed or segmentIndex != segmentCount or point == lastPoint:
+                yield ("lineTo", (point,))
+            lastPoint = point
+        elif pointType == curvePointType:
+            yield ("curveTo", tuple(segmentPoints))
+            lastPoint = point
+        elif pointType == qCurvePointType:
+            yield ("qCurveTo", tuple(segmentPoints))
+            lastPoint = point
+        segmentPoints = []
+    if closed:
+        yield ("closePath", ())
+    else:
+        yield ("endPath", ())
+
+
+def compileGlyphFromPoints(glyph, smooth=False):
+    """
+    Make a CompiledGlyph from any object with
+    `width` and `drawPoints`. If `smooth` is True,
+    the smooth flags will be guessed.
+    """
+    pen = CompiledGlyphPointPen()
+    if smooth:
+        glyph.drawPoints(GuessSmoothPointPen(pen))
+    else:
+        glyph.drawPoints(pen)
+    return pen.getGlyph(width=glyph.width)
+
+def joinCompiledGlyphs(glyphs, offsets, width=0):
+    """
+    Join `glyphs` into one CompiledGlyph. Each glyph
+    is shifted horizontally by the value in `offsets`.
+    """
+    glyphs = list(glyphs)
+    if not glyphs:
+        return CompiledGlyph(width=width)
+    coordinates = []
+    contourEnds = []
+    pointCount = 0
+    for glyph, offset in zip(glyphs, offsets):
+        c = glyph.coordinates
+        if offset:
+            c = c + (offset, 0)
+        coordinates.append(c)
+        contourEnds.append(glyph.contourEnds + pointCount)
+        pointCount += len(glyph.coordinates)
+    return CompiledGlyph(
+        width=width,
+        coordinates=numpy.concatenate(coordinates),
+        pointTypes=numpy.concatenate([glyph.pointTypes for glyph in glyphs]),
+        smooths=numpy.concatenate([glyph.smooths for glyph in glyphs]),
+        contourEnds=numpy.concatenate(contourEnds)
+    )
+
+
+class CompiledGlyphPointPen(AbstractPointPen):
+
+    """
+    Collect the points of a glyph into flat lists
+    and turn them into a CompiledGlyph.
+    Components are ignored.
+    """
+
+    def __init__(self):
+        self.coordinates = []
+        self.pointTypes = []
+        self.smooths = []
+        self.contourEnds = []
+
+    def beginPath(self, identifier=None, **kwargs):
+        pass
+
+    def addPoint(self, pt, segmentType=None, smooth=False, name=None, identifier=None, **kwargs):
+        self.coordinates.append(pt)
+        self.pointTypes.append(segmentTypeToPointType[segmentType])
+        self.smooths.append(smooth)
+
+    def endPath(self):
+        self.contourEnds.append(len(self.coordinates) - 1)
+
+    def addComponent(self, baseGlyphName, transformation, identifier=None, **kwargs):
+        pass
+
+    def getGlyph(self, width=0):
+        return CompiledGlyph(
+            width=width,
+            coordinates=numpy.array(self.coordinates, dtype=float).reshape((-1, 2)),
+            pointTypes=numpy.array(self.pointTypes, dtype=numpy.int8),
+            smooths=numpy.array(self.smooths, dtype=bool),
+            contourEnds=numpy.array(self.contourEnds, dtype=int)
+        )
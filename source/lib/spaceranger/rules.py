@@ -0,0 +1,68 @@
+import bisect
+from fontTools.designspaceLib import processRules
+
+class RuleSubstitutions:
+
+    """
+    Apply designspace rules with the results cached
+    by rule region.
+
+    - `rules` The rules from the designspace.
+
+    The condition minimums and maximums split each axis
+    into ranges. Every location in the same combination
+    of ranges matches the same rules, so the rules only
+    need to be processed once for each combination and
+    glyph name list. Make a new object when the rules
+    change.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        axisBounds = {}
+        for rule in rules:
+            for conditionSet in rule.conditionSets:
+                for condition in conditionSet:
+                    name = condition["name"]
+                    if name not in axisBounds:
+                        axisBounds[name] = set()
+                    for key in ("minimum", "maximum"):
+                        value = condition.get(key)
+                        if value is not None:
+                            axisBounds[name].add(value)
+        self.axisBounds = {
+            name: sorted(bounds)
+            for name, bounds in axisBounds.items()
+        }
+        self._substitutions = {}
+
+    def getRegionKey(self, location):
+        """
+        Get a key for the rule region containing `location`.
+        """
+        key = []
+        for name, bounds in self.axisBounds.items():
+            value = location.get(name)
+            if value is None:
+                key.append(None)
+                continue
+            # the conditions include their bounds,
+            # so a value on a bound is its own range.
+            index = bisect.bisect_left(bounds, value)
+            onBound = index < len(bounds) and bounds[index] == value
+            key.append((index, onBound))
+        return tuple(key)
+
+    def process(self, location, glyphNames):
+        """
+        Apply the rules at `location` to `glyphNames`.
+        The result should not be modified.
+        """
+        if not self.rules:
+            return glyphNames
+        key = (self.getRegionKey(location), tuple(glyphNames))
+        substituted = self._substitutions.get(key)
+        if substituted is None:
+            substituted = processRules(self.rules, location, glyphNames)
+            self._substitutions[key] = substituted
+        return substituted
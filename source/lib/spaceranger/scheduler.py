@@ -0,0 +1,163 @@
+import time
+
+defaultFrameInterval = 1.0 / 60
+defaultMaximumInterval = 0.5
+defaultCostFactor = 1.0
+
+class UpdateScheduler:
+
+    """
+    Coalesce update requests into at most one
+    refresh per frame.
+
+    - `callback` Called with `glyphNames` (a set) and
+      `kerning` (a bool) to perform the refresh.
+    - `callLater` A function that calls `function(*args)`
+      after `delay` seconds: `callLater(delay, function, *args)`.
+      PyObjCTools.AppHelper.callLater works for this.
+    - `frameInterval` The minimum time between the
+      starts of two refreshes.
+    - `maximumInterval` The longest time a request
+      will be deferred because of the refresh cost.
+    - `costFactor` After a refresh that took `n` seconds,
+      the next refresh will wait for `n * costFactor`
+      seconds. This leaves time for the editor when
+      the refreshes are expensive.
+    - `asynchronous` If True, a refresh is not finished
+      when `callback` returns. `refreshDidFinish` must
+      be called when it is. No refresh is started while
+      another one is running.
+
+    Requests that arrive while a refresh is pending are
+    merged into it. A pending refresh can be dropped with
+    `cancel` when it has been superseded by a full update.
+    """
+
+    def __init__(self,
+            callback,
+            callLater,
+            frameInterval=defaultFrameInterval,
+            maximumInterval=defaultMaximumInterval,
+            costFactor=defaultCostFactor,
+            asynchronous=False
+        ):
+        self.callback = callback
+        self.callLater = callLater
+        self.frameInterval = frameInterval
+        self.maximumInterval = maximumInterval
+        self.costFactor = costFactor
+        self.asynchronous = asynchronous
+        self.lastCost = 0
+        self._lastStart = None
+        self._lastEnd = None
+        self._generation = 0
+        self._scheduled = False
+        self._running = False
+        self._glyphNames = set()
+        self._kerning = False
+
+    def isPending(self):
+        return self._scheduled
+
+    def isRunning(self):
+        """
+        Get a bool indicating if an asynchronous
+        refresh has started and not finished.
+        """
+        return self._running
+
+    def schedule(self, glyphNames=None, kerning=False):
+        """
+        Request a refresh for `glyphNames` and/or
+        a kerning change.
+        """
+        if glyphNames:
+            self._glyphNames.update(glyphNames)
+        if kerning:
+            self._kerning = True
+        self._arm()
+
+    def _arm(self):
+        if self._scheduled or self._running:
+            return
+        if not self._glyphNames and not self._kerning:
+            return
+        self._scheduled = True
+        self.callLater(self.getDelay(), self._fire, self._generation)
+
+    def getDelay(self):
+        """
+        Get the time to wait before the next refresh.
+        """
+        if self._lastStart is None:
+            return 0
+        now = time.perf_counter()
+        wait = min(self.lastCost * self.costFactor, self.maximumInterval)
+        earliest = max(
+            self._lastStart + self.frameInterval,
+            self._lastEnd + wait
+        )
+        return max(0, earliest - now)
+
+    def cancel(self):
+        """
+        Drop the pending refresh. This returns the
+        (glyphNames, kerning) that were pending so that
+        the caller can account for them.
+        """
+        pending = (self._glyphNames, self._kerning)
+        self._generation += 1
+        self._scheduled = False
+        self._running = False
+        self._glyphNames = set()
+        self._kerning = False
+        return pending
+
+    def flush(self):
+        """
+        Perform the pending refresh now.
+        """
+        if self._scheduled:
+            self._fire(self._generation)
+
+    def _fire(self, generation):
+        # a refresh scheduled before a cancel is stale
+        if generation != self._generation or not self._scheduled:
+            return
+        glyphNames = self._glyphNames
+        kerning = self._kerning
+        self._scheduled = False
+        self._glyphNames = set()
+        self._kerning = False
+        self._lastStart = time.perf_counter()
+        if self.asynchronous:
+            self._running = True
+            try:
+                self.callback(glyphNames=glyphNames, kerning=kerning)
+            except BaseException:
+                # the refresh never started, so nothing
+                # will call refreshDidFinish. without this
+                # no other refresh would ever be started.
+                self.refreshDidFinish()
+                raise
+        else:
+            try:
+                self.callback(glyphNames=glyphNames, kerning=kerning)
+            finally:
+                self._finish()
+
+    def refreshDidFinish(self):
+        """
+        Tell the scheduler that an asynchronous refresh
+        is finished. Requests that arrived while it was
+        running will be scheduled.
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._finish()
+        self._arm()
+
+    def _finish(self):
+        self._lastEnd = time.perf_counter()
+        self.lastCost = self._lastEnd - self._lastStart
@@ -0,0 +1,194 @@
+import json
+import time
+import functools
+import threading
+import statistics
+from collections import deque
+
+# Histogram bucket upper bounds in seconds.
+# Anything slower goes into a final overflow bucket.
+histogramBounds = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0
+)
+
+defaultSampleCount = 100
+defaultTraceCount = 20
+
+class PhaseTimer:
+
+    """
+    Time named phases of work.
+
+    - `sampleCount` The number of recent durations kept
+      for each phase.
+    - `traceCount` The number of recent updates kept
+      for Chrome traces.
+
+    Phases can be nested. When the outermost phase
+    ends, it and everything inside of it is stored
+    as one update in the trace history. Each thread
+    has its own nesting.
+
+        with timer.phase("updateItems"):
+            with timer.phase("compile"):
+                ...
+    """
+
+    def __init__(self, sampleCount=defaultSampleCount, traceCount=defaultTraceCount):
+        self.sampleCount = sampleCount
+        self._samples = {}
+        self._counts = {}
+        self._traces = deque(maxlen=traceCount)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def _begin(self):
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        if depth == 0:
+            local.trace = []
+        local.depth = depth + 1
+        return time.perf_counter()
+
+    def _end(self, name, start):
+        end = time.perf_counter()
+        duration = end - start
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.sampleCount)
+                self._counts[name] = 0
+            samples.append(duration)
+            self._counts[name] += 1
+        local = self._local
+        local.depth -= 1
+        local.trace.append((name, start, duration, threading.get_ident()))
+        if local.depth == 0:
+            self._traces.append(local.trace)
+            local.trace = None
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+        self._traces.clear()
+
+    # Output
+
+    def getStats(self):
+        """
+        Get the stats for each phase. This returns a dict
+        of phase name : dict with these keys:
+
+        - `count` The number of times the phase has run.
+        - `last` The most recent duration.
+        - `mean`, `median`, `minimum`, `maximum` Calculated
+          from the recent durations.
+        - `histogram` A list of (upper bound, count) for the
+          recent durations. The last bound is None.
+
+        All times are in seconds.
+        """
+        with self._lock:
+            allSamples = {name: list(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        stats = {}
+        for name, samples in allSamples.items():
+            histogram = [0 for i in range(len(histogramBounds) + 1)]
+            for duration in samples:
+                index = len(histogramBounds)
+                for i, bound in enumerate(histogramBounds):
+                    if duration <= bound:
+                        index = i
+                        break
+                histogram[index] += 1
+            stats[name] = dict(
+                count=counts[name],
+                last=samples[-1],
+                mean=statistics.mean(samples),
+                median=statistics.median(samples),
+                minimum=min(samples),
+                maximum=max(samples),
+                histogram=list(zip(histogramBounds + (None,), histogram))
+            )
+        return stats
+
+    def getChromeTrace(self, updateCount=None):
+        """
+        Get the most recent `updateCount` updates, or all
+        stored updates, in the Chrome trace event format.
+        The result can be loaded in chrome://tracing
+        or Perfetto after being written as JSON.
+        """
+        traces = list(self._traces)
+        if updateCount is not None:
+            traces = traces[-updateCount:]
+        events = []
+        for trace in traces:
+            for name, start, duration, thread in trace:
+                events.append(
+                    dict(
+                        name=name,
+                        cat="spaceranger",
+                        ph="X",
+                        ts=start * 1000000,
+                        dur=duration * 1000000,
+                        pid=1,
+                        tid=thread
+                    )
+                )
+        events.sort(key=lambda event: (event["ts"], -event["dur"]))
+        return dict(
+            traceEvents=events,
+            displayTimeUnit="ms"
+        )
+
+    def writeChromeTrace(self, path, updateCount=None):
+        trace = self.getChromeTrace(updateCount=updateCount)
+        with open(path, "w") as f:
+            json.dump(trace, f)
+
+
+class _Phase:
+
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = self.timer._begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer._end(self.name, self.start)
+
+
+def timedPhase(name):
+    """
+    Decorate a method of an object with a `timer`
+    attribute so that each call is timed as `name`.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.timer.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
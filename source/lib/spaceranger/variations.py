@@ -0,0 +1,320 @@
+from collections import OrderedDict
+import numpy
+from mutatorMath.objects.location import Location
+from .caches import makeLocationKey
+from .outlines import (
+    CompiledGlyph,
+    CompiledGlyphPointPen
+)
+
+# --------------
+# Source Weights
+# --------------
+
+# the number of locations to keep weights for
+defaultSourceWeightsCacheSize = 4096
+
+class SourceWeights:
+
+    """
+    The weight of each source at any location, calculated
+    with the operator's own interpolation model.
+
+    - `ufoOperator` The operator. Its `useVarlib` decides
+      if MutatorMath or varLib is used.
+    - `sourceLocations` The continuous design space
+      locations of the sources.
+    - `discreteLocation` The discrete location.
+    - `maximumCacheSize` The number of locations the
+      weights are kept for. The least recently used
+      are dropped first.
+
+    The interpolated values are a weighted sum of the source
+    values. Giving the operator's model one unit vector per
+    source gives those weights, so any number of values can
+    be interpolated with one matrix product and the results
+    match `makeOneGlyph`, `makeOneKerning` and `makeOneInfo`.
+    If the model can't be built, `mutator` is None.
+    """
+
+    def __init__(self, ufoOperator, sourceLocations, discreteLocation=None, maximumCacheSize=defaultSourceWeightsCacheSize):
+        self.ufoOperator = ufoOperator
+        self.sourceCount = len(sourceLocations)
+        self.maximumCacheSize = maximumCacheSize
+        self.mutator = None
+        self._weights = OrderedDict()
+        if not sourceLocations:
+            return
+        identity = numpy.identity(self.sourceCount)
+        items = [
+            (Location(location), identity[i])
+            for i, location in enumerate(sourceLocations)
+        ]
+        bias = ufoOperator.newDefaultLocation(bend=True, discreteLocation=discreteLocation)
+        try:
+            bias, self.mutator = ufoOperator.getVariationModel(
+                items,
+                axes=ufoOperator.getSerializedAxes(),
+                bias=bias
+            )
+        except Exception:
+            # the operator treats any error here
+            # as an unusable set of sources.
+            self.mutator = None
+
+    def getWeights(self, locations):
+        """
+        Get a (locations x sources) array of weights
+        for design space `locations`.
+        """
+        ufoOperator = self.ufoOperator
+        clip = not getattr(ufoOperator, "extrapolate", False)
+        weights = self._weights
+        keys = [makeLocationKey(location) for location in locations]
+        found = {}
+        for key, location in zip(keys, locations):
+            if key in found:
+                continue
+            if key in weights:
+                weights.move_to_end(key)
+                found[key] = weights[key]
+                continue
+            if None in location:
+                # remove bogus y axis value
+                location = {k: v for k, v in location.items() if k is not None}
+            continuous, discrete = ufoOperator.splitLocation(location)
+            if clip:
+                continuous = ufoOperator.clipDesignLocation(continuous)
+            weights[key] = found[key] = self.mutator.makeInstance(Location(continuous), bend=False)
+        while len(weights) > self.maximumCacheSize:
+            weights.popitem(last=False)
+        # the weights are taken from found because more
+        # locations than the cache holds may be asked for.
+        return numpy.array([found[key] for key in keys], dtype=float).reshape((len(keys), self.sourceCount))
+
+
+def getSourceWeights(ufoOperator, sourceLocations, discreteLocation=None, cache=None):
+    """
+    Get a SourceWeights for `sourceLocations`. If `cache`
+    is a dict, the objects are shared through it by
+    every caller with the same sources.
+    """
+    if cache is None:
+        return SourceWeights(ufoOperator, sourceLocations, discreteLocation=discreteLocation)
+    key = (
+        bool(ufoOperator.useVarlib),
+        makeLocationKey(discreteLocation),
+        tuple(makeLocationKey(location) for location in sourceLocations)
+    )
+    sourceWeights = cache.get(key)
+    if sourceWeights is None:
+        sourceWeights = SourceWeights(ufoOperator, sourceLocations, discreteLocation=discreteLocation)
+        cache[key] = sourceWeights
+    return sourceWeights
+
+# ---------------------
+# Glyph Variation Model
+# ---------------------
+
+class GlyphVariationModel:
+
+    """
+    A model for one glyph over its sources. The point
+    coordinates and the width of each source are stored
+    in a row of a NumPy array, so any number of locations
+    can be evaluated with one matrix product.
+
+    The source weights come from the operator's own
+    model, so the results are the same as those from
+    `ufoOperator.makeOneGlyph` with `useVarlib` set to
+    `ufoOperator.useVarlib`.
+
+    If the sources are not compatible, `compatible`
+    will be False and `interpolate` can't be used.
+    `makeFallbackGlyphs` can be used instead.
+
+    The source data is copied when the model is made,
+    so the model can be used on another thread while
+    the fonts are edited.
+    """
+
+    def __init__(self, glyphName, ufoOperator, discreteLocation=None, sourceWeightsCache=None):
+        self.glyphName = glyphName
+        self.ufoOperator = ufoOperator
+        self.discreteLocation = discreteLocation
+        self.template = None
+        self.compatible = False
+        self.sourceWeights = None
+        self.masters = None
+        self.sourceGlyphs = None
+        self._fallbackMutator = None
+        sources, unicodes = ufoOperator.collectSourcesForGlyph(
+            glyphName,
+            discreteLocation=discreteLocation,
+            decomposeComponents=True,
+            asMathGlyph=True
+        )
+        if not sources:
+            return
+        # the math glyphs are copies of the sources.
+        # they are kept for the fallback.
+        self.sourceGlyphs = [
+            (sourceLocation, mathGlyph)
+            for sourceLocation, mathGlyph, sourceInfo in sources
+        ]
+        sourceLocations = []
+        sourceValues = []
+        for sourceLocation, mathGlyph in self.sourceGlyphs:
+            pen = CompiledGlyphPointPen()
+            mathGlyph.drawPoints(pen)
+            glyph = pen.getGlyph(width=mathGlyph.width)
+            # the point types, smooth flags and contour
+            # ends of the first source are shared by
+            # all of the interpolated glyphs.
+            if self.template is None:
+                self.template = glyph
+            elif not numpy.array_equal(glyph.pointTypes, self.template.pointTypes):
+                return
+            elif not numpy.array_equal(glyph.contourEnds, self.template.contourEnds):
+                return
+            sourceLocations.append(sourceLocation)
+            sourceValues.append(numpy.concatenate(([glyph.width], glyph.coordinates.ravel())))
+        self.sourceWeights = getSourceWeights(
+            ufoOperator,
+            sourceLocations,
+            discreteLocation=discreteLocation,
+            cache=sourceWeightsCache
+        )
+        if self.sourceWeights.mutator is None:
+            return
+        self.masters = numpy.array(sourceValues, dtype=float)
+        self.compatible = True
+        self.sourceGlyphs = None
+
+    def getWeights(self, locations):
+        """
+        Get a (locations x sources) array of weights for `locations`.
+        """
+        return self.sourceWeights.getWeights(locations)
+
+    def interpolate(self, locations):
+        """
+        Evaluate the model at all `locations` at once.
+        This returns a (locations x values) array. The
+        first value in each row is the width.
+        """
+        return self.getWeights(locations) @ self.masters
+
+    def interpolateWidths(self, locations):
+        """
+        Evaluate only the width at all `locations` at once.
+        """
+        return self.getWeights(locations) @ self.masters[:, 0]
+
+    def makeGlyphs(self, locations):
+        """
+        Make a CompiledGlyph for each of `locations`.
+        """
+        template = self.template
+        weights = self.getWeights(locations)
+        # the width is calculated the same way as in
+        # interpolateWidths so that the results match.
+        widths = weights @ self.masters[:, 0]
+        glyphs = []
+        for width, values in zip(widths, weights @ self.masters[:, 1:]):
+            glyphs.append(
+                CompiledGlyph(
+                    width=float(width),
+                    coordinates=values.reshape((-1, 2)),
+                    pointTypes=template.pointTypes,
+                    smooths=template.smooths,
+                    contourEnds=template.contourEnds
+                )
+            )
+        return glyphs
+
+    def makeFallbackGlyphs(self, locations):
+        """
+        Interpolate the source glyphs at `locations` one at
+        a time, the way `ufoOperator.makeOneGlyph` does, but
+        from the copies in the model. This returns a list
+        with a MathGlyph or None for each location.
+        """
+        ufoOperator = self.ufoOperator
+        if self.sourceGlyphs is None:
+            return [None for location in locations]
+        mutator = self._fallbackMutator
+        if mutator is None:
+            items = [
+                (
+                    Location(sourceLocation),
+                    ufoOperator.mathGlyphClass(mathGlyph, strict=ufoOperator.strict)
+                )
+                for sourceLocation, mathGlyph in self.sourceGlyphs
+            ]
+            bias = ufoOperator.newDefaultLocation(bend=True, discreteLocation=self.discreteLocation)
+            try:
+                bias, mutator = ufoOperator.getVariationModel(
+                    items,
+                    axes=ufoOperator.getSerializedAxes(),
+                    bias=bias
+                )
+            except Exception:
+                mutator = None
+            if mutator is None:
+                self.sourceGlyphs = None
+                return [None for location in locations]
+            self._fallbackMutator = mutator
+        clip = not getattr(ufoOperator, "extrapolate", False)
+        glyphs = []
+        for location in locations:
+            if None in location:
+                # remove bogus y axis value
+                location = {k: v for k, v in location.items() if k is not None}
+            continuous, discrete = ufoOperator.splitLocation(location)
+            if clip:
+                continuous = ufoOperator.clipDesignLocation(continuous)
+            try:
+                glyph = mutator.makeInstance(Location(continuous), bend=False)
+            except IndexError:
+                # the operator gives up here too
+                glyph = None
+            glyphs.append(glyph)
+        return glyphs
+
+
+class GlyphVariationModels:
+
+    """
+    Storage for glyph variation models keyed by
+    glyph name and discrete location. The source
+    weights are shared by glyphs with the same
+    source locations.
+    """
+
+    def __init__(self, ufoOperator):
+        self.ufoOperator = ufoOperator
+        self._models = {}
+        self.sourceWeights = {}
+
+    def getModel(self, glyphName, discreteLocation=None):
+        key = (glyphName, makeLocationKey(discreteLocation))
+        model = self._models.get(key)
+        if model is None:
+            model = GlyphVariationModel(
+                glyphName,
+                self.ufoOperator,
+                discreteLocation=discreteLocation,
+                sourceWeightsCache=self.sourceWeights
+            )
+            self._models[key] = model
+        return model
+
+    def invalidateGlyphNames(self, glyphNames):
+        for key in list(self._models.keys()):
+            if key[0] in glyphNames:
+                del self._models[key]
+
+    def clear(self):
+        self._models.clear()
+        self.sourceWeights.clear()
@@ -0,0 +1,1900 @@
+import pathlib
+import weakref
+from fontTools.pens.basePen import (
+    decomposeQuadraticSegment,
+    decomposeSuperBezierSegment
+)
+import AppKit
+import Quartz
+from PyObjCTools import AppHelper
+import merz
+import ezui
+from ezui.tools.converters import makeValueToStringConverter
+from mojo.UI import (
+    splitText,
+    inDarkMode
+)
+from mojo.extensions import (
+    registerExtensionDefaults,
+    getExtensionDefault,
+    setExtensionDefault,
+    removeExtensionDefault
+)
+from mojo.subscriber import Subscriber
+from fontParts.world import(
+    CurrentGlyph
+)
+try:
+    import prepolator
+    havePrepolator = True
+except (ModuleNotFoundError, AttributeError):
+    havePrepolator = False
+from .engine import (
+    SpaceRangerGrid,
+    itemPointSize,
+    processGlyphNames,
+    splitSuffix
+)
+from .caches import (
+    GlyphPathCache,
+    makeLocationKey
+)
+from .timing import timedPhase
+from .scheduler import UpdateScheduler
+from .worker import GridWorker
+
+extensionIdentifier = "com.typesupply.SpaceRanger"
+extensionKeyStub = extensionIdentifier + "."
+
+debug = __name__ == "__main__"
+
+modeColors = dict(
+    light=dict(
+        background=(1, 1, 1, 1),
+        fill=(0, 0, 0, 1),
+        sourceBorder=(0, 0, 0, 0.25),
+        instanceBorder=(0, 0, 0, 0.1),
+        locationTextFill=(1, 1, 1, 1),
+        locationTextBackground=(0, 0, 0, 0.9),
+    ),
+    dark=dict(
+        background=(0, 0, 0, 1),
+        fill=(1, 1, 1, 1),
+        sourceBorder=(1, 1, 1, 0.25),
+        instanceBorder=(1, 1, 1, 0.1),
+        locationTextFill=(0, 0, 0, 1),
+        locationTextBackground=(1, 1, 1, 0.95),
+    ),
+)
+zoomPointSizeOptions = [
+    25,
+    50,
+    100,
+    150,
+    200,
+    300,
+    400,
+    500,
+    600,
+    700,
+    800,
+    900,
+    1000,
+    1250,
+    1500
+]
+zoomPointSizeOptionTitles = [f"{i} pt" for i in zoomPointSizeOptions]
+zoomUpSlowFactor = 1.05
+zoomDownSlowFactor = 1.0 / zoomUpSlowFactor
+zoomUpFastFactor = 1.2
+zoomDownFastFactor = 1.0 / zoomUpFastFactor
+
+itemCornerRadius = itemPointSize * 0.07
+# items are kept for cells within this fraction
+# of the visible size outside of the visible rect.
+itemRecycleMargin = 0.5
+# the most steps on an axis
+maximumAxisStepCount = 100
+
+minZoomScale = min(zoomPointSizeOptions) / itemPointSize
+maxZoomScale = max(zoomPointSizeOptions) / itemPointSize
+
+defaults = dict(
+    applyRules=False,
+    applyKerning=True,
+
+    xAxisName="undefined",
+    xAxisMode="count", # count | locations | instances
+    xAxisCount=5,
+    xAxisLocations=[-1000, 0, 1000],
+    xAxisReverse=False,
+
+    yAxisName="undefined",
+    yAxisMode="count",
+    yAxisCount=5,
+    yAxisLocations=[-1000, 0, 1000],
+    yAxisReverse=False,
+
+    columnWidthMode="fit",
+
+    invertColors=False,
+
+    insertSources=False,
+    insertInstances=False,
+
+    highlightSources=False,
+    highlightInstances=False,
+
+    highlightKinks=False,
+    highlightSourceKinks=True,
+    autoSmoothDefault=True,
+
+    usePrepolator=False,
+)
+publicWindowSettings = list(defaults.keys())
+d = {}
+for k, v in defaults.items():
+    d[extensionKeyStub + k] = v
+defaults = d
+registerExtensionDefaults(defaults)
+
+# ---------------
+# Legacy Settings
+# ---------------
+
+unsmoothThresholdKey = extensionKeyStub + "unsmoothThreshold"
+unsmoothThresholdFallback = "undefined"
+
+if getExtensionDefault(unsmoothThresholdKey, fallback=unsmoothThresholdFallback) != unsmoothThresholdFallback:
+    removeExtensionDefault(unsmoothThresholdKey)
+
+renames = dict(
+    highlightUnsmooths="highlightKinks",
+    highlightSourceUnsmooths="highlightSourceKinks"
+)
+renameFallbackValue = "Rename Fallback Value"
+
+for oldKey, newKey in renames.items():
+    oldValue = getExtensionDefault(oldKey, fallback=renameFallbackValue)
+    if oldValue != renameFallbackValue:
+        removeExtensionDefault(oldKey)
+        setExtensionDefault(newKey, oldValue)
+
+# ---------
+# Scripting
+# ---------
+
+class SpaceRangerError(Exception): pass
+
+def _getExistingUFOOperatorForFont(font):
+    operators = AllDesignspaces(usingFont=font)
+    if not operators:
+        return None
+    return operators[0]
+
+def _getExistingUFOOperatorForPath(path):
+    operators = AllDesignspaces()
+    for operator in operators:
+        if operator.path == path:
+            return operator
+    return None
+
+def _getSpaceRanger(ufoOperator=None, font=None, path=None, createOperator=False):
+    if all((ufoOperator is None, font is None, path is None)):
+        raise SpaceRangerError("A ufoOperator, font or path must be given.")
+    if font is not None:
+        ufoOperator = _getExistingUFOOperatorForFont(font)
+        if ufoOperator is None and createOperator:
+            raise SpaceRangerError(f"A UFOOperator for {font} could not be found.")
+    elif path is not None:
+        ufoOperator = _getExistingUFOOperatorForPath(path)
+        if ufoOperator is None and createOperator:
+            ufoOperator = OpenDesignspace(path=path, showInterface=False)
+            ufoOperator.loadFonts()
+    if ufoOperator is None:
+        return None
+    tempLib = getattr(ufoOperator, "tempLib", {})
+    # already have one, return it if it is still live
+    spaceRanger = tempLib.get("SpaceRangerWindowController")
+    if spaceRanger is not None:
+        spaceRanger = spaceRanger()
+    if spaceRanger:
+        return spaceRanger
+    # create and return
+    spaceRanger = SpaceRangerWindowController(
+        ufoOperator=ufoOperator
+    )
+    return spaceRanger
+
+def OpenSpaceRanger(ufoOperator=None, font=None, path=None):
+    """
+    Open a Space Ranger for one of these:
+
+    - `ufoOperator` A `UFOOperator` object.
+    - `font` A font used in an open UFOOperator.
+    - `path` A designspace path.
+
+    If a Space Ranger for the given arguiment is open,
+    it will be returned instead of opening a new one.
+    """
+    spaceRanger = _getSpaceRanger(
+        ufoOperator=ufoOperator,
+        font=font,
+        path=path,
+        createOperator=True
+    )
+    return spaceRanger
+
+def setText(text, ufoOperator=None, font=None):
+    """
+    Set the text in the Space Ranger that corresponds
+    to `ufoOperator` or `font`. `text` must be a string.
+    """
+    spaceRanger = _getSpaceRanger(
+        ufoOperator=ufoOperator,
+        font=font,
+        createOperator=False
+    )
+    spaceRanger.scriptingSetText(text)
+
+def getWindowSettings(ufoOperator=None, font=None):
+    """
+    Get the window settings for the Space Ranger
+    that corresponds to `ufoOperator` or `font`.
+    """
+    spaceRanger = _getSpaceRanger(
+        ufoOperator=ufoOperator,
+        font=font,
+        createOperator=False
+    )
+    return spaceRanger.scriptingGetWindowSettings()
+
+def setWindowSettings(settings, ufoOperator=None, font=None):
+    """
+    Set the window settings for the Space Ranger
+    that corresponds to `ufoOperator` or `font`.
+    `settings` does not have to include all of the
+    possible settings, only the ones you want to change.
+    """
+    spaceRanger = _getSpaceRanger(
+        ufoOperator=ufoOperator,
+        font=font,
+        createOperator=False
+    )
+    spaceRanger.scriptingSetWindowSettings(settings)
+
+def getPerformanceStats(ufoOperator=None, font=None, tracePath=None, traceUpdateCount=None):
+    """
+    Get the timing stats for each phase of the updates
+    in the Space Ranger that corresponds to `ufoOperator`
+    or `font`. If `tracePath` is given, the most recent
+    updates will be written to it as a Chrome trace.
+    `traceUpdateCount` limits the number of updates
+    written to the trace.
+    """
+    spaceRanger = _getSpaceRanger(
+        ufoOperator=ufoOperator,
+        font=font,
+        createOperator=False
+    )
+    return spaceRanger.scriptingGetPerformanceStats(
+        tracePath=tracePath,
+        traceUpdateCount=traceUpdateCount
+    )
+
+
+# -----------------
+# Window Controller
+# -----------------
+
+zoomSymbolSize = 16
+zoomSymbolConfiguration=dict(
+    pointSize=zoomSymbolSize,
+    weight="light"
+)
+
+zoomToWidthInactiveImage = ezui.makeImage(
+    symbolName="arrow.left.and.right.square",
+    template=True
+)
+zoomToWidthInactiveImage = ezui.tools.applySymbolConfigurationToImage(zoomToWidthInactiveImage, zoomSymbolConfiguration)
+zoomToWidthActiveImage = ezui.makeImage(
+    symbolName="arrow.left.and.right.square.fill",
+    template=True
+)
+zoomToWidthActiveImage = ezui.tools.applySymbolConfigurationToImage(zoomToWidthActiveImage, zoomSymbolConfiguration)
+
+zoomToHeightInactiveImage = ezui.makeImage(
+    symbolName="arrow.up.and.down.square",
+    template=True
+)
+zoomToHeightInactiveImage = ezui.tools.applySymbolConfigurationToImage(zoomToHeightInactiveImage, zoomSymbolConfiguration)
+zoomToHeightActiveImage = ezui.makeImage(
+    symbolName="arrow.up.and.down.square.fill",
+    template=True
+)
+zoomToHeightActiveImage = ezui.tools.applySymbolConfigurationToImage(zoomToHeightActiveImage, zoomSymbolConfiguration)
+
+zoomToBothInactiveImage = ezui.makeImage(
+    symbolName="arrow.up.left.and.arrow.down.right.square",
+    template=True
+)
+zoomToBothInactiveImage = ezui.tools.applySymbolConfigurationToImage(zoomToBothInactiveImage, zoomSymbolConfiguration)
+zoomToBothActiveImage = ezui.makeImage(
+    symbolName="arrow.up.left.and.arrow.down.right.square.fill",
+    template=True
+)
+zoomToBothActiveImage = ezui.tools.applySymbolConfigurationToImage(zoomToBothActiveImage, zoomSymbolConfiguration)
+
+class SpaceRangerWindowController(Subscriber, ezui.WindowController):
+
+    debug = debug
+
+    def build(self,
+            ufoOperator=None
+        ):
+        if not hasattr(ufoOperator, "tempLib"):
+            ufoOperator.tempLib = {}
+        ufoOperator.tempLib["SpaceRangerWindowController"] = weakref.ref(self)
+
+        self.ufoOperator = ufoOperator
+        self.prepolator = None
+        if havePrepolator:
+            self.prepolator = prepolator.OpenPrepolator(
+                ufoOperator=ufoOperator,
+                showInterface=False
+            )
+        # (glyph name, discrete location key) : incompatible
+        self.prepolatorResults = {}
+        # changed glyphs that are in the default source
+        self.changedDefaultGlyphNames = set()
+        self.adjunctGlyphs = set()
+        self.adjunctKernings = set()
+        self.adjunctInfos = set()
+
+        startText = "HELLO"
+        glyph = CurrentGlyph()
+        if glyph is not None:
+            startText = "/?"
+
+        content = """
+        * HorizontalStack   @toolbarStack
+        > [__]              @textField
+        > [_ ...]           @zoomPointSizeComboBox
+        > ({arrows})        @zoomToWidthButton
+        > ({arrows})        @zoomToHeightButton
+        > ({arrows})        @zoomToBothButton
+        > ---               @line1
+        > ({gearshape})     @settingsButton
+
+        * ScrollingMerzView @gridView
+        """
+        numberFieldWidth = 50
+
+        settingsSymbolConfiguration = dict(zoomSymbolConfiguration)
+        settingsSymbolConfiguration["pointSize"] = 15
+        descriptionData = dict(
+            content=dict(
+                spacing=0
+            ),
+            toolbarStack=dict(
+                margins=(10, 10),
+                width="fill",
+                distribution="gravity"
+            ),
+            textField=dict(
+                value=startText,
+                width="fill"
+            ),
+            zoomPointSizeComboBox=dict(
+                items=zoomPointSizeOptionTitles,
+                value=f"{itemPointSize} pt",
+                width=80,
+                gravity="trailing"
+            ),
+            zoomToBothButton=dict(
+                image=zoomToBothInactiveImage,
+                gravity="trailing"
+            ),
+            zoomToWidthButton=dict(
+                image=zoomToWidthInactiveImage,
+                gravity="trailing"
+            ),
+            zoomToHeightButton=dict(
+                image=zoomToHeightInactiveImage,
+                gravity="trailing"
+            ),
+            line1=dict(
+                gravity="trailing"
+            ),
+            settingsButton=dict(
+                gravity="trailing",
+                symbolConfiguration=settingsSymbolConfiguration
+            ),
+            gridView=dict(
+                backgroundColor=(1, 1, 1, 1),
+                width=">=300",
+                height=">=300",
+                delegate=self
+            )
+        )
+        title = "Space Ranger"
+        if self.ufoOperator.path is not None:
+            title = f"Space Ranger: {pathlib.Path(self.ufoOperator.path).name}"
+
+        self.w = ezui.EZWindow(
+            autosaveName=extensionKeyStub + "MainWindow",
+            content=content,
+            descriptionData=descriptionData,
+            controller=self,
+            title=title,
+            margins=(0, 0, 0, 0),
+            size=(500, 500),
+            minSize=(400, 400)
+        )
+        self.w.workspaceWindowIdentifier = "Space Ranger Window"
+
+        self.gridView = self.w.getItem("gridView")
+        self.gridContainer = self.gridView.getMerzContainer()
+        self.gridItemContainer = self.gridContainer.appendBaseSublayer(name="gridItemContainer")
+        self.gridContainer.setContainerScale(1.0)
+
+        self._updateZoomButtons()
+        self.loadSettings()
+        self.loadColors()
+        self.loadOperatorOptions()
+        self.parseTextInput()
+        self.grid = SpaceRangerGrid(
+            ufoOperator=ufoOperator,
+            settings=self.settings
+        )
+        self.timer = self.grid.timer
+        self.items = {}
+        self._spareItems = []
+        # id(item) : content hash of the path in the item
+        self._itemPathHashes = {}
+        self.glyphPathCache = GlyphPathCache()
+        self.worker = GridWorker(
+            callAfter=AppHelper.callAfter
+        )
+        self.updateScheduler = UpdateScheduler(
+            callback=self._scheduledUpdateCallback,
+            callLater=AppHelper.callLater,
+            asynchronous=True
+        )
+
+    _scrollObserver = None
+
+    def started(self):
+        self.w.open()
+        # follow the scrolling so that the visible
+        # cells can be compiled first.
+        clipView = self.gridView.getNSScrollView().contentView()
+        clipView.setPostsBoundsChangedNotifications_(True)
+        self._scrollObserver = AppKit.NSNotificationCenter.defaultCenter().addObserverForName_object_queue_usingBlock_(
+            AppKit.NSViewBoundsDidChangeNotification,
+            clipView,
+            None,
+            self._gridViewBoundsDidChange
+        )
+        self.buildItems()
+        self.prepareItems()
+        self.updateItems()
+
+    def destroy(self):
+        if self._scrollObserver is not None:
+            AppKit.NSNotificationCenter.defaultCenter().removeObserver_(self._scrollObserver)
+            self._scrollObserver = None
+        self.updateScheduler.cancel()
+        self.worker.shutdown()
+        self.clearObservedAdjunctObjects()
+        del self.ufoOperator.tempLib["SpaceRangerWindowController"]
+
+    # Grid
+
+    def parseTextInput(self):
+        glyphNames = splitText(
+            self.w.getItemValue("textField"),
+            cmap=self.ufoOperator.getCharacterMapping()
+        )
+        self.settings["unprocessedGlyphNames"] = glyphNames
+
+    @timedPhase("buildItems")
+    def buildItems(self):
+        """
+        Build the cells. Layers are only made for the
+        visible cells and they are recycled as the
+        grid is scrolled.
+
+        The items are keyed by (column index, row index).
+        The items for coordinates that are still in the
+        grid are kept and redrawn by the next update.
+        The others are kept for reuse.
+        """
+        self.worker.cancel()
+        self._showLocationOverlay(None)
+        grid = self.grid
+        grid.buildCells()
+        items = self.items
+        for key in list(items.keys()):
+            if grid.getCell(*key) is None:
+                item = items.pop(key)
+                item.setVisible(False)
+                self._spareItems.append(item)
+
+    def _makeItem(self):
+        base = merz.Base(
+            borderWidth=1,
+            cornerRadius=itemCornerRadius,
+            # backgroundColor=(1, 0, 0, 0.25),
+        )
+        glyphContainerLayer = base.appendBaseSublayer(
+            name="glyphContainer"
+        )
+        # glyph path
+        glyphContainerLayer.appendPathSublayer(
+            name="glyphPath"
+        )
+        # post-processing
+        glyphContainerLayer.appendBaseSublayer(
+            name="kinkHighlights"
+        )
+        return base
+
+    def _bindItem(self, item, cell):
+        # show `cell` in a new or recycled item.
+        self._updateItemFrame(item, cell, layoutChanged=True)
+        self._updateItemContents(item, cell)
+
+    _locationOverlay = None
+    _locationOverlayCell = None
+
+    def _showLocationOverlay(self, cell):
+        """
+        Show the location info for `cell` over it.
+        If `cell` is None, the info is hidden. One
+        layer is shared by all of the cells.
+        """
+        if cell is self._locationOverlayCell:
+            return
+        self._locationOverlayCell = cell
+        overlay = self._locationOverlay
+        if cell is None or cell.position is None:
+            if overlay is not None:
+                overlay.setVisible(False)
+            return
+        if overlay is None:
+            # this is above the items
+            overlay = self._locationOverlay = self.gridContainer.appendTextBoxSublayer(
+                horizontalAlignment="left",
+                cornerRadius=itemCornerRadius,
+                padding=(itemCornerRadius, itemCornerRadius),
+                pointSize=10,
+                figureStyle="tabular"
+            )
+        locationText = []
+        if cell.isSource:
+            locationText.append(
+                dict(
+                    text="Source\n",
+                    weight="bold"
+                )
+            )
+        if cell.isInstance:
+            locationText.append(
+                dict(
+                    text="Instance\n",
+                    weight="bold"
+                )
+            )
+        locationText += [
+            dict(text=f"• {k}: {numberToStringConverter(v)}\n")
+            for k, v in sorted(cell.location.items())
+        ]
+        with overlay.propertyGroup():
+            overlay.setPosition(cell.position)
+            overlay.setSize(cell.size)
+            overlay.setFillColor(self.locationTextFillColor)
+            overlay.setBackgroundColor(self.locationTextBackgroundColor)
+            overlay.setText(locationText)
+            overlay.setVisible(True)
+
+    @timedPhase("visibleItems")
+    def _updateVisibleItems(self):
+        """
+        Make sure that there is an item for each visible
+        cell. The items for cells that are no longer
+        visible are hidden and kept for reuse.
+        """
+        visibleRect = self.grid.visibleRect
+        if visibleRect is None:
+            return
+        # keep a margin around the visible rect so
+        # that small scrolls don't recycle anything.
+        x, y, width, height = visibleRect
+        xMargin = width * itemRecycleMargin
+        yMargin = height * itemRecycleMargin
+        cells = self.grid.getCellsInRect(
+            (x - xMargin, y - yMargin, width + (xMargin * 2), height + (yMargin * 2))
+        )
+        items = self.items
+        spareItems = self._spareItems
+        keys = set((cell.columnIndex, cell.rowIndex) for cell in cells)
+        for key in list(items.keys()):
+            if key not in keys:
+                item = items.pop(key)
+                item.setVisible(False)
+                spareItems.append(item)
+        for cell in cells:
+            key = (cell.columnIndex, cell.rowIndex)
+            if key in items:
+                continue
+            if spareItems:
+                item = spareItems.pop()
+                item.setVisible(True)
+            else:
+                item = self._makeItem()
+                self.gridItemContainer.appendSublayer(item)
+            items[key] = item
+            self._bindItem(item, cell)
+
+    @timedPhase("prepareItems")
+    def prepareItems(self):
+        self.worker.cancel()
+        settings = self.settings
+        # process the glyph names
+        currentGlyphName = ""
+        glyph = CurrentGlyph()
+        if glyph is not None:
+            currentGlyphName = glyph.name
+        settings["glyphNames"] = processGlyphNames(
+            settings["unprocessedGlyphNames"],
+            self.ufoOperator.glyphNames,
+            currentGlyphName=currentGlyphName,
+            suffix=settings["glyphNameSuffix"]
+        )
+        processedGlyphNames = self.grid.prepareCells()
+        # observe sources as adjunct glyphs, kerning and info
+        newAdjunctGlyphs = set()
+        newAdjunctKernings = set()
+        newAdjunctInfos = set()
+        for glyph in self.grid.collectSourceGlyphs(processedGlyphNames):
+            newAdjunctGlyphs.add(glyph)
+            newAdjunctKernings.add(glyph.font.kerning)
+            newAdjunctInfos.add(glyph.font.info)
+        for glyph in self.adjunctGlyphs:
+            if glyph not in newAdjunctGlyphs:
+                self.removeObservedAdjunctObject(glyph)
+        for glyph in newAdjunctGlyphs:
+            if glyph not in self.adjunctGlyphs:
+                self.addAdjunctObjectToObserve(glyph)
+        self.adjunctGlyphs = newAdjunctGlyphs
+        for kerning in self.adjunctKernings:
+            if kerning not in newAdjunctKernings:
+                self.removeObservedAdjunctObject(kerning)
+        for kerning in newAdjunctKernings:
+            if kerning not in self.adjunctKernings:
+                self.addAdjunctObjectToObserve(kerning)
+        self.adjunctKernings = newAdjunctKernings
+        for info in self.adjunctInfos:
+            if info not in newAdjunctInfos:
+                self.removeObservedAdjunctObject(info)
+        for info in newAdjunctInfos:
+            if info not in self.adjunctInfos:
+                self.addAdjunctObjectToObserve(info)
+        self.adjunctInfos = newAdjunctInfos
+
+    @timedPhase("updateItems")
+    def updateItems(self, glyphNames=None, kerningPairs=None):
+        """
+        Update the items. If `glyphNames` or `kerningPairs`
+        are given, only the items that depend on those
+        will be recompiled. Otherwise, everything is updated.
+
+        The compiling is done by the worker. The layers
+        are updated on the main thread as each batch of
+        cells is finished, starting with the visible cells.
+        """
+        # the grid can't be changed while
+        # the worker is using it.
+        self.worker.cancel()
+        if glyphNames is None and kerningPairs is None:
+            # a full update supersedes a scheduled update,
+            # but the changes it was waiting for must
+            # still be applied to the caches.
+            pendingGlyphNames, pendingKerning = self.updateScheduler.cancel()
+            if pendingGlyphNames:
+                self._invalidateGlyphNames(pendingGlyphNames)
+            if pendingKerning:
+                self.grid.reloadKerning()
+        # run prepolator
+        self._runPrepolator(self.settings["glyphNames"])
+        # the worker only reads the copies
+        # of the source data made here.
+        self.grid.loadSources()
+        # compile
+        self._updateVisibleRect()
+        # if this is the scheduled refresh, the scheduler
+        # must be told when it ends, even if the job is
+        # cancelled and nothing replaces it.
+        cancelCallback = None
+        if self.updateScheduler.isRunning():
+            cancelCallback = self.updateScheduler.refreshDidFinish
+        self.worker.submit(
+            self._compileItems,
+            self._updateItemsDidFinish,
+            glyphNames=glyphNames,
+            kerningPairs=kerningPairs,
+            progressCallback=self._updateItemsDidProgress,
+            cancelCallback=cancelCallback
+        )
+
+    @timedPhase("updateCells")
+    def _compileItems(self, glyphNames, kerningPairs, cancelToken, progress):
+        # this runs on the worker thread.
+        for batch in self.grid.iterateUpdateCells(
+                glyphNames=glyphNames,
+                kerningPairs=kerningPairs,
+                cancelToken=cancelToken
+            ):
+            progress(batch)
+
+    def _updateItemsDidFinish(self, future):
+        self.updateScheduler.refreshDidFinish()
+        # raise anything that went wrong in the worker
+        future.result()
+
+    def _updateItemsDidProgress(self, batch):
+        frameCells, contentCells, layoutChanged = batch
+        gridView = self.gridView
+        scrollView = self.gridView.getNSScrollView()
+        gridContainer = self.gridContainer
+        gridItemContainer = self.gridItemContainer
+        if layoutChanged:
+            # the cell under the location info may have moved
+            self._showLocationOverlay(None)
+            # set the grid size
+            width = self.grid.width
+            height = self.grid.height
+            gridItemContainer.setSize((width, height))
+            # set the container size
+            zoomScale = self.gridContainer.getContainerScale()
+            gridContainer.setSize((width * zoomScale, height * zoomScale))
+            gridView.setMerzViewSize((width * zoomScale, height * zoomScale))
+            gridContainer.setBackgroundColor(self.backgroundColor)
+            scrollView.setBackgroundColor_(ezui.makeColor(self.backgroundColor))
+            if self._zoomToFitMode is not None:
+                self._zoomToFit(self._zoomToFitMode)
+            self._updateVisibleRect()
+        self._updateItemLayers(frameCells, contentCells, layoutChanged)
+        # cells that were just laid out may be visible
+        self._updateVisibleItems()
+
+    @timedPhase("layers")
+    def _updateItemLayers(self, frameCells, contentCells, layoutChanged):
+        # only the cells with items need to be drawn.
+        # the others are drawn when they become visible.
+        items = self.items
+        for cell in frameCells:
+            item = items.get((cell.columnIndex, cell.rowIndex))
+            if item is not None:
+                self._updateItemFrame(item, cell, layoutChanged)
+        for cell in contentCells:
+            item = items.get((cell.columnIndex, cell.rowIndex))
+            if item is not None:
+                self._updateItemContents(item, cell)
+
+    def _updateItemFrame(self, item, cell, layoutChanged):
+        if cell.position is None:
+            # not laid out yet
+            return
+        settings = self.settings
+        if layoutChanged:
+            item.setSize(cell.size)
+            item.setPosition(cell.position)
+            # update the source indicator
+            if settings["highlightSources"] and cell.isSource:
+                item.setBorderColor(self.sourceBorderColor)
+            elif settings["highlightInstances"] and cell.isInstance:
+                item.setBorderColor(self.instanceBorderColor)
+            else:
+                item.setBorderColor(None)
+        # update the glyph container
+        glyphContainerLayer = item.getSublayer("glyphContainer")
+        glyphContainerLayer.addSublayerScaleTransformation(cell.scale, "pointSizeScale")
+        glyphContainerLayer.setPosition(cell.glyphPosition)
+
+    def _updateItemContents(self, item, cell):
+        glyph = cell.glyph
+        scale = cell.scale
+        glyphContainerLayer = item.getSublayer("glyphContainer")
+        # set the path. this is skipped if the item
+        # already shows the same outline.
+        glyphPathLayer = glyphContainerLayer.getSublayer("glyphPath")
+        contentHash = None
+        if glyph is not None:
+            contentHash = glyph.getContentHash()
+        with glyphPathLayer.propertyGroup():
+            glyphPathLayer.setFillColor(self.fillColor)
+            if self._itemPathHashes.get(id(item)) != contentHash:
+                self._itemPathHashes[id(item)] = contentHash
+                if glyph is None:
+                    # not compiled yet
+                    glyphPathLayer.setPath(None)
+                else:
+                    glyphPathLayer.setPath(self._getGlyphPath(glyph))
+        # set the kinks
+        kinkHighlightLayer = glyphContainerLayer.getSublayer("kinkHighlights")
+        kinkHighlightLayer.clearSublayers()
+        if cell.kinks:
+            kinkHighlightSize = itemPointSize * 0.1 * (1.0 / scale)
+            kinkHighlightHalfSize = kinkHighlightSize / 2
+            for x, y, v in cell.kinks:
+                kinkHighlightLayer.appendOvalSublayer(
+                    position=(x-kinkHighlightHalfSize, y-kinkHighlightHalfSize),
+                    size=(kinkHighlightSize, kinkHighlightSize),
+                    fillColor=None,
+                    strokeColor=(1, 0, 0, v),
+                    strokeWidth=1
+                )
+
+    def _getGlyphPath(self, glyph):
+        path = self.glyphPathCache.get(glyph)
+        if path is None:
+            path = makeGlyphPath(glyph)
+            self.glyphPathCache.set(glyph, path)
+        return path
+
+    def _updateVisibleRect(self):
+        # give the grid the visible rect in grid coordinates
+        documentView = self.gridView.getMerzView().getNSView()
+        scale = self.gridContainer.getContainerScale()
+        (x, y), (width, height) = documentView.visibleRect()
+        self.grid.visibleRect = (x / scale, y / scale, width / scale, height / scale)
+
+    def _gridViewBoundsDidChange(self, notification):
+        # the worker checks the visible rect before each
+        # batch, so newly visible cells move to the front.
+        self._updateVisibleRect()
+        self._updateVisibleItems()
+
+    # Pre-Processing
+
+    @timedPhase("prepolator")
+    def _runPrepolator(self, glyphNames):
+        """
+        Find the glyphs that Prepolator can't make
+        compatible. The results are kept until the
+        glyph's sources change, so only new or
+        changed glyphs are checked.
+        """
+        settings = self.settings
+        if not settings["usePrepolator"] or self.prepolator is None:
+            self.grid.incompatibleGlyphs = set()
+            return
+        discreteLocation = settings["discreteLocation"]
+        discreteLocationKey = makeLocationKey(discreteLocation)
+        results = self.prepolatorResults
+        uncheckedGlyphNames = [
+            glyphName
+            for glyphName in set(glyphNames)
+            if (glyphName, discreteLocationKey) not in results
+        ]
+        if uncheckedGlyphNames:
+            availableGlyphNames = self.prepolator.getCompatibilitySpaceGlyphNames(discreteLocation)
+            for glyphName in uncheckedGlyphNames:
+                # glyphs that prepolator doesn't know about
+                # aren't kept because they may be added.
+                if glyphName not in availableGlyphNames:
+                    continue
+                group = self.prepolator.getCompatibilityGroupForGlyphName(glyphName, discreteLocation)
+                if group.unresolvableCompatibility:
+                    results[glyphName, discreteLocationKey] = True
+                    continue
+                for glyph in group.glyphs:
+                    if group.getGlyphIsIncompatible(glyph):
+                        group.matchModel(glyphs=[glyph])
+                        self.grid.invalidateGlyphNames([glyphName])
+                    elif group.getGlyphConfidence(glyph) <= 0.9:
+                        group.matchModel(glyphs=[glyph])
+                        self.grid.invalidateGlyphNames([glyphName])
+                results[glyphName, discreteLocationKey] = False
+        self.grid.incompatibleGlyphs = set(
+            glyphName
+            for glyphName in glyphNames
+            if results.get((glyphName, discreteLocationKey), False)
+        )
+
+    def _invalidatePrepolatorResults(self, glyphNames):
+        results = self.prepolatorResults
+        for key in list(results.keys()):
+            if key[0] in glyphNames:
+                del results[key]
+
+    # Text
+
+    def textFieldCallback(self, sender):
+        self._textChanged()
+
+    def _textChanged(self):
+        self.parseTextInput()
+        self.prepareItems()
+        self.updateItems()
+
+    # Zoom
+
+    _zoomToFitMode = None
+
+    def zoomPointSizeComboBoxCallback(self, sender):
+        value = sender.get()
+        value = value.replace("pt", "")
+        value = value.strip()
+        try:
+            value = float(value)
+        except ValueError:
+            return
+        scale = value / itemPointSize
+        self.performViewZoom(scale=scale)
+
+    def zoomToWidthButtonCallback(self, sender):
+        self._zoomToFit("width")
+
+    def zoomToHeightButtonCallback(self, sender):
+        self._zoomToFit("height")
+
+    def zoomToBothButtonCallback(self, sender):
+        self._zoomToFit("both")
+
+    def _zoomToFit(self, direction):
+        gridView = self.gridView
+        scrollView = self.gridView.getNSScrollView()
+        gridContainer = self.gridContainer
+        zoomScale = gridContainer.getContainerScale()
+        containerWidth, containerHeight = gridView.getMerzViewSize()
+        availableWidth, availableHeight = scrollView.contentSize()
+        xScale = availableWidth / containerWidth
+        yScale = availableHeight / containerHeight
+        if direction == "width":
+            scale = xScale
+        elif direction == "height":
+            scale = yScale
+        elif direction == "both":
+            scale = min((xScale, yScale))
+        if scale == 1.0:
+            return
+        zoomScale *= scale
+        self.performViewZoom(scale=zoomScale, fittingTo=direction)
+
+    def _updateZoomButtons(self):
+        zoomToWidthButton = self.w.getItem("zoomToWidthButton")
+        zoomToHeightButton = self.w.getItem("zoomToHeightButton")
+        zoomToBothButton = self.w.getItem("zoomToBothButton")
+        if self._zoomToFitMode == "width":
+            zoomToWidthButton._button.setImage(imageObject=zoomToWidthActiveImage)
+        else:
+            zoomToWidthButton._button.setImage(imageObject=zoomToWidthInactiveImage)
+        if self._zoomToFitMode == "height":
+            zoomToHeightButton._button.setImage(imageObject=zoomToHeightActiveImage)
+        else:
+            zoomToHeightButton._button.setImage(imageObject=zoomToHeightInactiveImage)
+        if self._zoomToFitMode == "both":
+            zoomToBothButton._button.setImage(imageObject=zoomToBothActiveImage)
+        else:
+            zoomToBothButton._button.setImage(imageObject=zoomToBothInactiveImage)
+
+    _mouseZoomLastLocation = None
+
+    def performViewZoom(self, scale=None, event=None, fittingTo=None):
+        self._zoomToFitMode = fittingTo
+        gridView = self.gridView
+        documentView = gridView.getMerzView().getNSView()
+        gridContainer = self.gridContainer
+        gridItemContainer = self.gridItemContainer
+        oldScale = gridContainer.getContainerScale()
+        unscaledWidth, unscaledHeight = gridView.getMerzViewSize()
+        unscaledWidth /= oldScale
+        unscaledHeight /= oldScale
+        # calculate the zoom factor pased on the event input.
+        if event is not None:
+            eventType = event.type()
+            eventInfo = merz.unpackEvent(event)
+            if eventType not in mousePhaseSimulationMap and "magnification" not in eventInfo:
+                eventInfo = tempEventUnpack(event)
+            # mouse zoom
+            if self.inMouseZoom:
+                # simulate the phase
+                eventInfo["phase"] = mousePhaseSimulationMap.get(eventType)
+                phase = eventInfo["phase"]
+                # return
+                if phase == "began" or self._mouseZoomLastLocation is None:
+                    self._zoomFocalPoint = eventInfo["location"]
+                    self._mouseZoomLastLocation = eventInfo["location"]
+                    factor = 1.0
+                elif phase == "ended":
+                    self._mouseZoomLastLocation = None
+                    factor = 1.0
+                else:
+                    x1, y1 = self._mouseZoomLastLocation
+                    x2, y2 = eventInfo["location"]
+                    if x2 < x1:
+                        factor = zoomDownSlowFactor
+                    else:
+                        factor = zoomUpSlowFactor
+            # gesture zoom
+            else:
+                magnification = eventInfo["magnification"]
+                phase = eventInfo["phase"]
+                if magnification < 0:
+                    factor = zoomDownSlowFactor
+                else:
+                    factor = zoomUpSlowFactor
+            scale = oldScale * factor
+        if scale > maxZoomScale:
+            scale = maxZoomScale
+        elif scale < minZoomScale:
+            scale = minZoomScale
+        # calculate the new size
+        width = unscaledWidth * scale
+        height = unscaledHeight * scale
+        # calculate the originating focal point in base
+        # units, then scale the point and make sure it is
+        # in the visible rect of the scroll view
+        if event is not None:
+            if phase == "began":
+                x, y = documentView.convertPoint_fromView_(
+                    eventInfo["location"],
+                    None
+                )
+                x /= oldScale
+                y /= oldScale
+                self._zoomFocalPoint = (x, y)
+            x, y = self._zoomFocalPoint
+            # XXX
+            # This triggers a traceback, but it could be related to my Wacom troubles.
+            # Bizarrely, if I insert a print to get the phase to debug, the traceback isn't raised.
+            # if phase == "ended":
+            #     del self._zoomFocalPoint
+        else:
+            (xMin, yMin), (visibleWidth, visibleHeight) = documentView.visibleRect()
+            x = xMin + (visibleWidth / 2)
+            y = yMin + (visibleHeight / 2)
+            x /= oldScale
+            y /= oldScale
+        visibleWidth, visibleHeight = documentView.visibleRect().size
+        x *= scale
+        y *= scale
+        x = x - (visibleWidth / 2)
+        y = y - (visibleHeight / 2)
+        # set the new scale and size
+        gridContainer.setContainerScale(scale)
+        gridView.setMerzViewSize((width, height))
+        # ask the document view to scroll the focal point
+        # into the visible rect if it isn't already there
+        documentView.scrollPoint_((x, y))
+        # update the point size combo box
+        pointSize = itemPointSize * scale
+        pointSize = int(round(pointSize))
+        comboBox = self.w.getItem("zoomPointSizeComboBox")
+        title = f"{pointSize} pt"
+        if comboBox.get() != title:
+            comboBox.set(title)
+        self._updateZoomButtons()
+        self._updateVisibleRect()
+        self._updateVisibleItems()
+
+    # Settings
+
+    def loadSettings(self):
+        self.settings = dict(
+            discreteLocations=[],
+            axisNames=[],
+            discreteLocation=None,
+            xAxisName=None,
+            yAxisName=None,
+            unprocessedGlyphNames=[],
+            glyphNames=[],
+        )
+        for key in defaults.keys():
+            value = getExtensionDefault(key)
+            key = key[len(extensionKeyStub):]
+            self.settings[key] = value
+
+    def writeSettings(self):
+        for key in defaults:
+            value = self.settings[key[len(extensionKeyStub):]]
+            setExtensionDefault(key, value)
+
+    def loadColors(self):
+        invertColors = self.settings["invertColors"]
+        if inDarkMode():
+            if invertColors:
+                colors = modeColors["light"]
+            else:
+                colors = modeColors["dark"]
+        else:
+            if invertColors:
+                colors = modeColors["dark"]
+            else:
+                colors = modeColors["light"]
+        self.backgroundColor = colors["background"]
+        self.fillColor = colors["fill"]
+        self.sourceBorderColor = colors["sourceBorder"]
+        self.instanceBorderColor = colors["instanceBorder"]
+        self.locationTextFillColor = colors["locationTextFill"]
+        self.locationTextBackgroundColor = colors["locationTextBackground"]
+
+    def loadOperatorOptions(self):
+        # Discrete Location
+        discreteLocations = []
+        discreteLocation = self.settings["discreteLocation"]
+        for dL in self.ufoOperator.getDiscreteLocations():
+            name = self.ufoOperator.nameLocation(dL)
+            discreteLocations.append(dL)
+        # don't allow an unknown discrete axis.
+        if discreteLocation not in discreteLocations:
+            discreteLocation = None
+        if discreteLocation is None and discreteLocations:
+            discreteLocation = discreteLocations[0]
+        self.settings["discreteLocation"] = discreteLocation
+        self.settings["discreteLocations"] = discreteLocations
+        # Axes
+        axisNames = []
+        xAxisName = self.settings["xAxisName"]
+        yAxisName = self.settings["yAxisName"]
+        for axis in self.ufoOperator.getOrderedContinuousAxes():
+            name = axis.name
+            axisNames.append(name)
+        # don't allow a y axis if there is only one axis.
+        if len(axisNames) < 2:
+            yAxisName = None
+        # an axis name could have changed.
+        # don't reference a missing name.
+        if xAxisName and xAxisName not in axisNames:
+            xAxisName = None
+        if yAxisName and yAxisName not in axisNames:
+            yAxisName = None
+        # pick an initial pair of axes. type designers
+        # like to look at x=width, y=weight, so that's
+        # the preferred default.
+        if xAxisName is None and axisNames:
+            xAxisName = axisNames[0]
+            if "width" in axisNames:
+                xAxisName = "width"
+        if yAxisName is None and len(axisNames) > 1:
+            if "weight" in axisNames and xAxisName != "weight":
+                yAxisName = "weight"
+            if yAxisName is None:
+                for name in axisNames:
+                    if name != xAxisName:
+                        yAxisName = name
+                        break
+        self.settings["axisNames"] = axisNames
+        self.settings["xAxisName"] = xAxisName
+        self.settings["yAxisName"] = yAxisName
+        # Suffixes
+        suffixes = set()
+        for glyphName in self.ufoOperator.glyphNames:
+            suffix = splitSuffix(glyphName)
+            if not suffix:
+                continue
+            suffixes.add(suffix)
+        self.settings["glyphNameSuffixes"] = list(sorted(suffixes))
+        self.settings["glyphNameSuffix"] = "_none_"
+
+    _gridSettingsWindowController = None
+
+    def settingsButtonCallback(self, sender):
+        if self._gridSettingsWindowController is not None:
+            self._gridSettingsWindowController.closePopover()
+            return
+        self._gridSettingsWindowController = SpaceRangerGridSettingsWindowController(
+            parent=sender,
+            settings=self.settings,
+            ufoOperator=self.ufoOperator,
+            editCallback=self._settingsPopoverEditCallback,
+            closeCallback=self._settingsPopoverCloseCallback
+        )
+
+    def _settingsPopoverEditCallback(self):
+        self._settingsChanged()
+
+    def _settingsChanged(self):
+        self.loadColors()
+        self.buildItems()
+        self.prepareItems()
+        self.updateItems()
+        self.writeSettings()
+
+    def _settingsPopoverCloseCallback(self):
+        self._gridSettingsWindowController = None
+
+    # RoboFont Observations
+
+    def roboFontAppearanceChanged(self, info):
+        self.loadColors()
+        self.updateItems()
+
+    def roboFontDidSwitchCurrentGlyph(self, info):
+        self.prepareItems()
+        self.updateItems()
+
+    # DSE Observations
+
+    def designspaceEditorSourcesDidChanged(self, info):
+        self.worker.cancel()
+        self.grid.clearCaches()
+        self.prepolatorResults.clear()
+        self.prepareItems()
+        self.updateItems()
+
+    def designspaceEditorAxesDidChange(self, info):
+        self.worker.cancel()
+        self.grid.clearCaches()
+        self.prepolatorResults.clear()
+        self.buildItems()
+        self.prepareItems()
+        self.updateItems()
+
+    designspaceEditorInstancesDidChangeDelay = 0.25
+
+    def designspaceEditorInstancesDidChange(self, info):
+        # the instance columns, rows and
+        # highlights may all be different.
+        self.worker.cancel()
+        self.grid.invalidateLocations()
+        self.buildItems()
+        self.prepareItems()
+        self.updateItems()
+
+    designspaceEditorRulesDidChangeDelay = 0.75
+
+    def designspaceEditorRulesDidChange(self, info):
+        if not self.settings["applyRules"]:
+            # an update doesn't read the rules when
+            # they are off, so one that is running
+            # can be left to finish.
+            self.grid.invalidateRules()
+            return
+        self.worker.cancel()
+        self.grid.invalidateRules()
+        self.prepareItems()
+        self.updateItems()
+
+    # XXX this only works if this object was created
+    # with registerRoboFontSubscriber. instead, the
+    # source glyphs are observed as adjunct objects.
+    #
+    # def designspaceEditorSourceGlyphDidChange(self, info):
+
+    # Glyph Observations
+
+    # these can arrive many times per second while
+    # a point is dragged, so the updates are coalesced
+    # by the scheduler instead of being run here. the
+    # caches are invalidated when the scheduled update
+    # runs because the worker may be using them now.
+
+    def adjunctGlyphDidChangeOutline(self, info):
+        self._sourceGlyphDidChange(info["glyph"])
+
+    def adjunctGlyphDidChangeMetrics(self, info):
+        self._sourceGlyphDidChange(info["glyph"])
+
+    def _sourceGlyphDidChange(self, glyph):
+        # the kink model only depends on the default
+        # source, so keep track of changes there.
+        if self._isDefaultSourceGlyph(glyph):
+            self.changedDefaultGlyphNames.add(glyph.name)
+        self.updateScheduler.schedule(glyphNames=[glyph.name])
+
+    def _isDefaultSourceGlyph(self, glyph):
+        # the notification glyph and the operator's fonts
+        # may be wrapped differently, so compare the
+        # defcon objects. if it can't be decided,
+        # assume the worst.
+        source = self.ufoOperator.findDefault(discreteLocation=self.settings["discreteLocation"])
+        if source is None:
+            return True
+        font = getNakedObject(self.ufoOperator.fonts.get(source.name))
+        glyph = getNakedObject(glyph)
+        glyphFont = glyph.font
+        layer = glyph.layer
+        if font is None or glyphFont is None or layer is None:
+            return True
+        if glyphFont is not font:
+            if font.path is None or glyphFont.path is None:
+                return True
+            if pathlib.Path(font.path).resolve() != pathlib.Path(glyphFont.path).resolve():
+                return False
+        if source.layerName is None:
+            return layer.name == font.layers.defaultLayer.name
+        return layer.name == source.layerName
+
+    def _invalidateGlyphNames(self, glyphNames):
+        # invalidate everything that depends on the
+        # glyphs. this returns the invalidated glyph names.
+        glyphNames = self.grid.invalidateGlyphNames(
+            glyphNames,
+            defaultGlyphNames=self.changedDefaultGlyphNames
+        )
+        self.changedDefaultGlyphNames = set()
+        self._invalidatePrepolatorResults(glyphNames)
+        return glyphNames
+
+    def adjunctFontKerningDidChange(self, info):
+        self.updateScheduler.schedule(kerning=True)
+
+    # Font Info Observations
+
+    adjunctFontInfoDidChangeDelay = 0.25
+
+    def adjunctFontInfoDidChange(self, info):
+        # only the vertical metrics are used, so
+        # other info changes don't need an update.
+        if self.grid.reloadVerticalMetrics():
+            self.updateItems()
+
+    def _scheduledUpdateCallback(self, glyphNames, kerning):
+        self.worker.cancel()
+        # remove the glyphs and anything that uses
+        # them as components from the caches.
+        if glyphNames:
+            glyphNames = self._invalidateGlyphNames(glyphNames)
+        # only the items containing the glyphs or
+        # pairs with new values need to be updated.
+        kerningPairs = set()
+        if kerning:
+            kerningPairs = self.grid.reloadKerning()
+        if not glyphNames and not kerningPairs:
+            self.updateScheduler.refreshDidFinish()
+            return
+        self.updateItems(glyphNames=glyphNames, kerningPairs=kerningPairs)
+
+    # MerzView Delegate
+
+    def acceptsFirstResponder(self, sender):
+        return True
+
+    def magnifyWithEvent(self, sender, event):
+        self.performViewZoom(event=event)
+
+    def _findCellForEvent(self, event):
+        # the cell is calculated from the layout
+        # rather than by searching the layers.
+        location = event["location"]
+        location = self.gridContainer.convertWindowCoordinateToLayerCoordinate(
+            point=location,
+            view=self.gridView
+        )
+        return self.grid.getCellAtPoint(location)
+
+    def mouseDown(self, sender, event):
+        if self.inMouseZoom:
+            self.performViewZoom(event=event)
+            return
+        event = merz.unpackEvent(event)
+        clickCount = event["clickCount"]
+        if clickCount != 2:
+            return
+        cell = self._findCellForEvent(event)
+        if cell is None or not cell.isSource:
+            return
+        source = self.grid.sources.get(cell.locationKey)
+        if source is None:
+            return
+        font = self.ufoOperator.fonts.get(source.name)
+        if font is None:
+            return
+        font = font.asFontParts()
+        if not font.hasInterface():
+            font.openInterface()
+
+    def mouseDragged(self, sender, event):
+        if self.inMouseZoom:
+            self.performViewZoom(event=event)
+
+    def mouseUp(self, sender, event):
+        if self.inMouseZoom:
+            self.performViewZoom(event=event)
+        self.inMouseZoom = False
+
+    def acceptsMouseMoved(self, sender):
+        return True
+
+    def mouseMoved(self, sender, event):
+        event = merz.unpackEvent(event)
+        cell = None
+        if event["modifiers"] == ["option"]:
+            cell = self._findCellForEvent(event)
+        # this does nothing if the cell didn't change
+        self._showLocationOverlay(cell)
+
+    inMouseZoom = False
+
+    def keyDown(self, sender, event):
+        event = merz.unpackEvent(event)
+        modifiers = event["modifiers"]
+        character = event["character"]
+        if all((modifiers == ["command"], character == " ")):
+            self.inMouseZoom = True
+        elif all((modifiers == ["command"], character in "-=")):
+            scale = self.gridContainer.getContainerScale()
+            if character == "=":
+                scale *= zoomUpFastFactor
+            elif character == "-":
+                scale *= zoomDownFastFactor
+            else:
+                return
+            self.performViewZoom(scale=scale)
+
+    # Scripting API
+
+    def scriptingSetText(self, text):
+        textField = self.w.setItemValue("textField", text)
+        self._textChanged()
+
+    def scriptingGetWindowSettings(self):
+        settings = {}
+        for key in publicWindowSettings:
+            settings[key] = self.settings[key]
+        return settings
+
+    def scriptingGetPerformanceStats(self, tracePath=None, traceUpdateCount=None):
+        if tracePath is not None:
+            self.timer.writeChromeTrace(tracePath, updateCount=traceUpdateCount)
+        return self.timer.getStats()
+
+    def scriptingSetWindowSettings(self, settings):
+        for key in settings.keys():
+            if key not in publicWindowSettings:
+                raise SpaceRangerError(f"Unknown window setting: {key}")
+        self.settings.update(settings)
+        self._settingsChanged()
+
+
+def getNakedObject(obj):
+    """
+    Get the defcon object wrapped by a fontParts
+    object. Anything else is returned as it is.
+    """
+    naked = getattr(obj, "naked", None)
+    if naked is None:
+        return obj
+    return naked()
+
+def makeGlyphPath(glyph):
+    """
+    Make a CGPath from a CompiledGlyph. The segments
+    are added directly instead of through a pen.
+    """
+    path = Quartz.CGPathCreateMutable()
+    for operator, points in glyph.iterateSegments():
+        if operator == "moveTo":
+            Quartz.CGPathMoveToPoint(path, None, *points[0])
+        elif operator == "lineTo":
+            Quartz.CGPathAddLineToPoint(path, None, *points[0])
+        elif operator == "curveTo":
+            if len(points) == 3:
+                segments = [points]
+            else:
+                segments = decomposeSuperBezierSegment(points)
+            for (x1, y1), (x2, y2), (x3, y3) in segments:
+                Quartz.CGPathAddCurveToPoint(path, None, x1, y1, x2, y2, x3, y3)
+        elif operator == "qCurveTo":
+            if points[-1] is None:
+                # no on-curve points. start between
+                # the last and first off-curves.
+                (x1, y1), (x2, y2) = points[-2], points[0]
+                start = (0.5 * (x1 + x2), 0.5 * (y1 + y2))
+                Quartz.CGPathMoveToPoint(path, None, *start)
+                points = points[:-1] + (start,)
+            if len(points) == 1:
+                Quartz.CGPathAddLineToPoint(path, None, *points[0])
+                continue
+            for (x1, y1), (x2, y2) in decomposeQuadraticSegment(points):
+                Quartz.CGPathAddQuadCurveToPoint(path, None, x1, y1, x2, y2)
+        elif operator == "closePath":
+            Quartz.CGPathCloseSubpath(path)
+    return path
+
+def tempEventUnpack(event):
+    _gesturePhaseMap = {
+        AppKit.NSEventPhaseNone : "none",
+        AppKit.NSEventPhaseBegan : "began",
+        AppKit.NSEventPhaseStationary : "stationary",
+        AppKit.NSEventPhaseChanged : "changed",
+        AppKit.NSEventPhaseEnded : "ended",
+        AppKit.NSEventPhaseCancelled : "cancelled",
+        AppKit.NSEventPhaseMayBegin : "begin"
+    }
+    unpacked = dict(
+        phase=_gesturePhaseMap.get(event.phase(), "unknown"),
+        location=event.locationInWindow(),
+        magnification=event.magnification()
+    )
+    return unpacked
+
+mousePhaseSimulationMap = {
+    AppKit.NSEventTypeLeftMouseDown : "began",
+    AppKit.NSEventTypeLeftMouseDragged : "changed",
+    AppKit.NSEventTypeLeftMouseUp : "ended"
+}
+
+# ----------------
+# Settings Popover
+# ----------------
+
+class SpaceRangerGridSettingsWindowController(ezui.WindowController):
+
+    def build(self,
+            parent,
+            settings={},
+            ufoOperator=None,
+            editCallback=None,
+            closeCallback=None
+        ):
+        self.settings = settings
+        self.editCallback = editCallback
+        self.closeCallback = closeCallback
+
+        discreteLocationNames = [
+            ufoOperator.nameLocation(dL)
+            for dL in settings["discreteLocations"]
+        ]
+        discreteLocationIndex = 0
+        if settings["discreteLocation"]:
+            discreteLocationIndex = settings["discreteLocations"].index(settings["discreteLocation"])
+
+        applyRules = settings["applyRules"]
+        applyKerning = settings["applyKerning"]
+
+        xAxisNames = settings["axisNames"]
+        xAxisIndex = 0
+        if settings["xAxisName"] in xAxisNames:
+            xAxisIndex = xAxisNames.index(settings["xAxisName"])
+        xAxisMode = ["count", "locations", "instances"].index(settings["xAxisMode"])
+        xAxisReverse = settings["xAxisReverse"]
+
+        yAxisNames = []
+        if len(xAxisNames) > 1:
+            yAxisNames = xAxisNames
+        yAxisIndex = 0
+        if settings["yAxisName"] in yAxisNames:
+            yAxisIndex = yAxisNames.index(settings["yAxisName"])
+        yAxisMode = ["count", "locations", "instances"].index(settings["yAxisMode"])
+        yAxisReverse = settings["yAxisReverse"]
+        if settings["columnWidthMode"] == "fit":
+            columnWidthMode = 0
+        else:
+            columnWidthMode = 1
+
+        insertSources = settings["insertSources"]
+        highlightSources = settings["highlightSources"]
+        insertInstances = settings["insertInstances"]
+        highlightInstances = settings["highlightInstances"]
+        invertColors = settings["invertColors"]
+
+        usePrepolator = settings["usePrepolator"]
+
+        highlightKinks = settings["highlightKinks"]
+        highlightSourceKinks = settings["highlightSourceKinks"]
+        autoSmoothDefault = settings["autoSmoothDefault"]
+
+        self.suffixes = ["_none_", "_auto_"]
+        suffixOptions = ["None", "Auto"]
+        suffixes = settings["glyphNameSuffixes"]
+        if suffixes:
+            self.suffixes.append("---")
+            suffixOptions.append("---")
+            for suffix in suffixes:
+                self.suffixes.append(suffix)
+                suffixOptions.append(suffix)
+        suffixIndex = 0
+        suffix = settings["glyphNameSuffix"]
+        if suffix in self.suffixes:
+            suffixIndex = self.suffixes.index(suffix)
+
+        content = """
+        = TwoColumnForm
+
+        !§ Text
+        : Suffix:
+        (Choose ...)            @textSuffixPopUpButton
+
+
+        !§ Display
+
+        : Discrete Location:
+        (Choose ...)            @discreteLocationPopUpButton
+
+        :
+        [ ] Apply Rules         @applyRulesCheckbox
+
+        :
+        [ ] Apply Kerning       @applyKerningCheckbox
+
+        ---
+
+        : X Axis:
+        (Choose ...)            @xAxisPopUpButton
+
+        : Mode:
+        (X) Count               @xAxisModeRadioButtons
+        ( ) Locations
+        ( ) Instances
+
+        :
+        [__]                    @xAxisValueField
+
+        :
+        [ ] Reverse             @xAxisReverseCheckbox
+
+        : Widths:
+        (X) Fit Content         @columnWidthsRadioButtons
+        ( ) Monospace
+
+        ---
+
+        : Y Axis:
+        (Choose ...)            @yAxisPopUpButton
+
+        : Mode:
+        (X) Count               @yAxisModeRadioButtons
+        ( ) Locations
+        ( ) Instances
+
+        :
+        [__]                    @yAxisValueField
+
+        :
+        [ ] Reverse             @yAxisReverseCheckbox
+
+        ---
+
+        : Sources:
+        [ ] Insert              @insertSourcesCheckbox
+        [ ] Highlight           @highlightSourcesCheckbox
+
+        : Instances:
+        [ ] Insert              @insertInstancesCheckbox
+        [ ] Highlight           @highlightInstancesCheckbox
+
+        ---
+
+        : Colors:
+        [ ] Invert              @invertColorsCheckbox
+
+        !§ Pre-Process
+
+        :
+        [X] Run Prepolator      @usePrepolatorCheckbox
+
+        !§ Post-Process
+
+        :
+        [X] Highlight Kinks     @highlightKinksCheckbox
+        :
+        [ ] Highlight Source Kinks @highlightSourceKinksCheckbox
+        :
+        [X] Auto-Smooth Default @autoSmoothDefaultCheckbox
+        """
+        numberFieldWidth = 50
+        descriptionData = dict(
+            content=dict(
+                titleColumnWidth=140,
+                itemColumnWidth=200,
+            ),
+
+            textSuffixPopUpButton=dict(
+                items=suffixOptions,
+                selected=suffixIndex
+            ),
+
+            discreteLocationPopUpButton=dict(
+                items=discreteLocationNames,
+                selected=discreteLocationIndex
+            ),
+            applyRulesCheckbox=dict(
+                value=applyRules
+            ),
+            applyKerningCheckbox=dict(
+                value=applyKerning
+            ),
+
+            xAxisPopUpButton=dict(
+                items=xAxisNames,
+                selected=xAxisIndex
+            ),
+            xAxisModeRadioButtons=dict(
+                selected=xAxisMode
+            ),
+            xAxisReverseCheckbox=dict(
+                value=xAxisReverse
+            ),
+            columnWidthsRadioButtons=dict(
+                selected=columnWidthMode
+            ),
+
+            yAxisPopUpButton=dict(
+                items=yAxisNames,
+                selected=yAxisIndex
+            ),
+            yAxisModeRadioButtons=dict(
+                selected=yAxisMode
+            ),
+            yAxisReverseCheckbox=dict(
+                value=yAxisReverse
+            ),
+
+            insertSourcesCheckbox=dict(
+                value=insertSources
+            ),
+            highlightSourcesCheckbox=dict(
+                value=highlightSources
+            ),
+            insertInstancesCheckbox=dict(
+                value=insertInstances
+            ),
+            highlightInstancesCheckbox=dict(
+                value=highlightInstances
+            ),
+            invertColorsCheckbox=dict(
+                value=invertColors
+            ),
+
+            usePrepolatorCheckbox=dict(
+                value=usePrepolator
+            ),
+
+            highlightKinksCheckbox=dict(
+                value=highlightKinks
+            ),
+            highlightSourceKinksCheckbox=dict(
+                value=highlightSourceKinks
+            ),
+            autoSmoothDefaultCheckbox=dict(
+                value=autoSmoothDefault
+            )
+        )
+        self.w = ezui.EZPopover(
+            content=content,
+            descriptionData=descriptionData,
+            parent=parent,
+            controller=self
+        )
+        self.w.bind("will close", self.windowWillClose)
+        self.xAxisModeRadioButtonsCallback(self.w.getItem("xAxisModeRadioButtons"))
+        self.yAxisModeRadioButtonsCallback(self.w.getItem("yAxisModeRadioButtons"))
+
+    def started(self):
+        self.w.open()
+
+    def destroy(self):
+        self.callback = None
+
+    def windowWillClose(self, sender):
+        self.w.unbind("will close", self.windowWillClose)
+        self.closeCallback()
+
+    def closePopover(self):
+        self.w.close()
+
+    def xAxisModeRadioButtonsCallback(self, sender):
+        settings = self.settings
+        choice = sender.get()
+        enable = True
+        if choice == 0:
+            settings["xAxisMode"] = "count"
+            value = str(settings["xAxisCount"])
+        elif choice == 1:
+            settings["xAxisMode"] = "locations"
+            value = " ".join([str(i) for i in settings["xAxisLocations"]])
+        elif choice == 2:
+            settings["xAxisMode"] = "instances"
+            value = ""
+            enable = False
+        self.w.setItemValue("xAxisValueField", value)
+        self.w.getItem("xAxisValueField").enable(enable)
+        self.contentCallback(sender)
+
+    def xAxisValueFieldCallback(self, sender):
+        settings = self.settings
+        mode = self.w.getItemValue("xAxisModeRadioButtons")
+        value = sender.get()
+        if mode == 0:
+            value = parseRangeInput(value)
+            if value is None:
+                return
+            settings["xAxisCount"] = value
+        else:
+            value = parseLocationInput(value)
+            if value is None:
+                return
+            settings["xAxisLocations"] = value
+        self.contentCallback(sender)
+
+    def yAxisModeRadioButtonsCallback(self, sender):
+        settings = self.settings
+        choice = sender.get()
+        enable = True
+        if choice == 0:
+            settings["yAxisMode"] = "count"
+            value = str(settings["yAxisCount"])
+        elif choice == 1:
+            settings["yAxisMode"] = "locations"
+            value = " ".join([str(i) for i in settings["yAxisLocations"]])
+        elif choice == 2:
+            settings["yAxisMode"] = "instances"
+            value = ""
+            enable = False
+        self.w.setItemValue("yAxisValueField", value)
+        self.w.getItem("yAxisValueField").enable(enable)
+        self.contentCallback(sender)
+
+    def yAxisValueFieldCallback(self, sender):
+        settings = self.settings
+        mode = self.w.getItemValue("yAxisModeRadioButtons")
+        value = sender.get()
+        if mode == 0:
+            value = parseRangeInput(value)
+            if value is None:
+                return
+            settings["yAxisCount"] = value
+        else:
+            value = parseLocationInput(value)
+            if value is None:
+                return
+            settings["yAxisLocations"] = value
+        self.contentCallback(sender)
+
+    def contentCallback(self, sender):
+        values = self.w.getItemValues()
+        settings = self.settings
+        settings["glyphNameSuffix"] = self.suffixes[values["textSuffixPopUpButton"]]
+        if settings["discreteLocations"]:
+            settings["discreteLocation"] = settings["discreteLocations"][values["discreteLocationPopUpButton"]]
+        settings["applyRules"] = values["applyRulesCheckbox"]
+        settings["applyKerning"] = values["applyKerningCheckbox"]
+        settings["xAxisName"] = settings["axisNames"][values["xAxisPopUpButton"]]
+        settings["xAxisReverse"] = values["xAxisReverseCheckbox"]
+        if len(settings["axisNames"]) > 1:
+            settings["yAxisName"] = settings["axisNames"][values["yAxisPopUpButton"]]
+        settings["yAxisReverse"] = values["yAxisReverseCheckbox"]
+        settings["columnWidthMode"] = ["fit", "mono"][values["columnWidthsRadioButtons"]]
+        settings["insertSources"] = values["insertSourcesCheckbox"]
+        settings["highlightSources"] = values["highlightSourcesCheckbox"]
+        settings["insertInstances"] = values["insertInstancesCheckbox"]
+        settings["highlightInstances"] = values["highlightInstancesCheckbox"]
+        settings["invertColors"] = values["invertColorsCheckbox"]
+        settings["usePrepolator"] = values["usePrepolatorCheckbox"]
+        settings["highlightKinks"] = values["highlightKinksCheckbox"]
+        settings["highlightSourceKinks"] = values["highlightSourceKinksCheckbox"]
+        settings["autoSmoothDefault"] = values["autoSmoothDefaultCheckbox"]
+        self.editCallback()
+
+
+def parseRangeInput(value):
+    try:
+        value = int(value)
+        # can't have less than two
+        if value < 2:
+            value = 2
+        # only the visible cells have layers, but every
+        # cell is still compiled in the background.
+        elif value > maximumAxisStepCount:
+            value = maximumAxisStepCount
+        return value
+    except ValueError:
+        return None
+
+def parseLocationInput(value):
+    try:
+        value = [float(i.strip()) for i in value.split(" ") if i.strip()]
+        return value
+    except ValueError:
+        return None
+
+numberToStringConverter = makeValueToStringConverter("number")
+
+if __name__ == "__main__":
+    OpenSpaceRanger(ufoOperator=CurrentDesignspace())
\ No newline at end of file
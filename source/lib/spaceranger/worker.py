@@ -0,0 +1,137 @@
+import concurrent.futures
+
+class UpdateCancelled(Exception): pass
+
+
+class CancelToken:
+
+    """
+    A flag that a long running job checks
+    to find out if it should stop.
+    """
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        """
+        Raise UpdateCancelled if the token has been cancelled.
+        """
+        if self.cancelled:
+            raise UpdateCancelled()
+
+
+class GridWorker:
+
+    """
+    Run one job at a time on a background thread.
+
+    - `callAfter` A function that calls `function(*args)`
+      on the main thread: `callAfter(function, *args)`.
+      PyObjCTools.AppHelper.callAfter works for this.
+
+    The fonts live in the main process, so a thread is
+    used rather than a process pool. Submitting a job
+    cancels the running job and waits for it to stop.
+    Jobs must accept a `cancelToken` keyword argument
+    and check it regularly.
+    """
+
+    def __init__(self, callAfter):
+        self.callAfter = callAfter
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="SpaceRanger"
+        )
+        self._future = None
+        self._token = None
+        self._cancelCallback = None
+
+    def isBusy(self):
+        return self._future is not None and not self._future.done()
+
+    def submit(self, function, callback, *args, progressCallback=None, cancelCallback=None, **kwargs):
+        """
+        Run `function(*args, cancelToken=token, **kwargs)`
+        in the background. When it is finished, `callback`
+        is called on the main thread with the finished
+        future unless the job was cancelled.
+
+        If `cancelCallback` is given, it is called with no
+        arguments when the job is cancelled before `callback`
+        was called. Exactly one of the two is called unless
+        the worker is shut down.
+
+        If `progressCallback` is given, the job is also
+        given a `progress` keyword argument. Calling
+        `progress(value)` from the job calls
+        `progressCallback(value)` on the main thread
+        unless the job has been cancelled by then.
+        """
+        self.cancel()
+        token = CancelToken()
+        if progressCallback is not None:
+            def progress(value):
+                self.callAfter(self._deliverProgress, token, value, progressCallback)
+            kwargs["progress"] = progress
+        future = self._executor.submit(function, *args, cancelToken=token, **kwargs)
+        self._future = future
+        self._token = token
+        self._cancelCallback = cancelCallback
+
+        def done(future):
+            if token.cancelled:
+                return
+            if isinstance(future.exception(), UpdateCancelled):
+                return
+            self.callAfter(self._deliver, token, future, callback)
+
+        future.add_done_callback(done)
+        return future
+
+    def _deliver(self, token, future, callback):
+        # the job may have been cancelled while this
+        # was waiting to be called on the main thread.
+        if token.cancelled:
+            return
+        if self._future is future:
+            self._future = None
+            self._token = None
+            self._cancelCallback = None
+        callback(future)
+
+    def _deliverProgress(self, token, value, progressCallback):
+        if token.cancelled:
+            return
+        progressCallback(value)
+
+    def cancel(self, wait=True):
+        """
+        Cancel the running job. If `wait` is True, this
+        blocks until the job has stopped so that the
+        caller can safely change what the job was using.
+        This must be called on the main thread.
+        """
+        future = self._future
+        token = self._token
+        cancelCallback = self._cancelCallback
+        self._future = None
+        self._token = None
+        self._cancelCallback = None
+        if future is None:
+            return
+        token.cancel()
+        if wait:
+            concurrent.futures.wait([future])
+        if cancelCallback is not None:
+            cancelCallback()
+
+    def shutdown(self):
+        self._cancelCallback = None
+        self.cancel(wait=False)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,65 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "lib"))
+
+from fontParts.fontshell import RFont
+from fontTools.designspaceLib import (
+    DesignSpaceDocument,
+    AxisDescriptor,
+    SourceDescriptor
+)
+from ufoProcessor.ufoOperator import UFOOperator
+from spaceranger.kerning import KerningEvaluator
+
+# (weight, group/glyph exception, glyph/group exception, group/group)
+sourceKerning = [
+    (0, -30, -50, -10),
+    (400, -60, -80, -20),
+    (1000, -90, -110, -40)
+]
+
+def makeDesignspace(directory):
+    doc = DesignSpaceDocument()
+    axis = AxisDescriptor()
+    axis.name = "weight"
+    axis.tag = "wght"
+    axis.minimum = 0
+    axis.default = 0
+    axis.maximum = 1000
+    doc.addAxis(axis)
+    for weight, groupGlyph, glyphGroup, groupGroup in sourceKerning:
+        font = RFont()
+        font.info.unitsPerEm = 1000
+        for glyphName in ("n", "o"):
+            font.newGlyph(glyphName).width = 500
+        font.groups["public.kern1.n"] = ["n"]
+        font.groups["public.kern2.o"] = ["o"]
+        font.kerning[("public.kern1.n", "o")] = groupGlyph
+        font.kerning[("n", "public.kern2.o")] = glyphGroup
+        font.kerning[("public.kern1.n", "public.kern2.o")] = groupGroup
+        path = os.path.join(directory, f"weight{weight}.ufo")
+        font.save(path)
+        source = SourceDescriptor()
+        source.path = path
+        source.name = f"weight{weight}"
+        source.location = dict(weight=weight)
+        doc.addSource(source)
+    path = os.path.join(directory, "test.designspace")
+    doc.write(path)
+    return path
+
+@pytest.mark.parametrize("useVarlib", [False, True])
+def test_exceptionsMatchOperator(tmp_path, useVarlib):
+    ufoOperator = UFOOperator(makeDesignspace(str(tmp_path)), useVarlib=useVarlib)
+    ufoOperator.loadFonts()
+    pair = ("n", "o")
+    evaluator = KerningEvaluator(ufoOperator, [pair])
+    locations = [dict(weight=weight) for weight in (0, 200, 400, 700, 1000)]
+    values = evaluator.evaluate(locations)
+    for location, value in zip(locations, values):
+        expected = ufoOperator.makeOneKerning(location, pairs=[pair])[pair]
+        assert value[pair] == pytest.approx(expected, abs=1e-9)
+    # the group/glyph exception wins
+    assert values[0][pair] == pytest.approx(-30)
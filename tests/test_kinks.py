@@ -0,0 +1,197 @@
+import os
+import sys
+import math
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "lib"))
+
+from fontParts.fontshell import RGlyph
+from spaceranger.outlines import compileGlyphFromPoints
+from spaceranger.kinks import (
+    KinkModel,
+    findKinks
+)
+
+# ------------------
+# Baseline Algorithm
+# ------------------
+
+# the per-segment check that the kink
+# model replaced, kept as it was.
+
+def calculateAngle(point1, point2, r=None):
+    width = point2[0] - point1[0]
+    height = point2[1] - point1[1]
+    angle = round(math.atan2(height, width) * 180 / math.pi, 3)
+    if r is not None:
+        angle = round(angle, r)
+    return angle
+
+def unwrapPoint(pt):
+    return (pt.x, pt.y)
+
+def getRelativeSmoothness(contour, segmentIndex, tolerance=0.05, threshold=2):
+    segments = list(contour.segments)
+    p = segmentIndex - 1
+    n = segmentIndex + 1
+    if n == len(segments):
+        n = 0
+    previousSegment = segments[p]
+    segment = segments[segmentIndex]
+    nextSegment = segments[n]
+    if segment.type == "curve" and nextSegment.type == "curve":
+        bcpIn = unwrapPoint(segment.offCurve[1])
+        anchor = unwrapPoint(segment.onCurve)
+        bcpOut = unwrapPoint(nextSegment.offCurve[0])
+        inPoints = (bcpIn, anchor)
+        outPoints = (anchor, bcpOut)
+    elif segment.type == "curve" and nextSegment.type == "line":
+        bcpIn = unwrapPoint(segment.offCurve[1])
+        anchor = unwrapPoint(segment.onCurve)
+        nextAnchor = unwrapPoint(nextSegment.onCurve)
+        inPoints = (bcpIn, anchor)
+        outPoints = (anchor, nextAnchor)
+    elif segment.type == "line" and nextSegment.type == "curve":
+        previousAnchor = unwrapPoint(previousSegment.onCurve)
+        anchor = unwrapPoint(segment.onCurve)
+        bcpOut = unwrapPoint(nextSegment.offCurve[0])
+        inPoints = (previousAnchor, anchor)
+        outPoints = (anchor, bcpOut)
+    else:
+        return 0
+    inAngle = calculateAngle(*inPoints)
+    outAngle = calculateAngle(*outPoints)
+    diff = abs(inAngle - outAngle)
+    if diff <= tolerance:
+        diff = 0
+    elif diff > threshold:
+        diff = threshold
+    return diff / threshold
+
+def findBaselineKinks(model, glyph):
+    modelSmooths = []
+    for contourIndex, contour in enumerate(model.contours):
+        for segmentIndex, segment in enumerate(contour.segments):
+            if segment.smooth:
+                modelSmooths.append((contourIndex, segmentIndex))
+    kinks = []
+    for contourIndex, segmentIndex in modelSmooths:
+        contour = glyph.contours[contourIndex]
+        v = getRelativeSmoothness(contour=contour, segmentIndex=segmentIndex)
+        if v:
+            onCurve = contour.segments[segmentIndex].onCurve
+            kinks.append((onCurve.x, onCurve.y, v))
+    return kinks
+
+# ------
+# Glyphs
+# ------
+
+def rotate(point, center, angle):
+    angle = math.radians(angle)
+    x = point[0] - center[0]
+    y = point[1] - center[1]
+    return (
+        center[0] + x * math.cos(angle) - y * math.sin(angle),
+        center[1] + x * math.sin(angle) + y * math.cos(angle)
+    )
+
+def makeGlyph(contours):
+    glyph = RGlyph()
+    glyph.width = 500
+    pen = glyph.getPointPen()
+    for contour in contours:
+        pen.beginPath()
+        for point, segmentType, smooth in contour:
+            pen.addPoint(point, segmentType=segmentType, smooth=smooth)
+        pen.endPath()
+    return glyph
+
+def makeSmoothContour(angle):
+    # all curves, the first bcp is rotated
+    return [
+        ((0, 250), "curve", True),
+        (rotate((0, 388), (0, 250), angle), None, False),
+        ((112, 500), None, False),
+        ((250, 500), "curve", True),
+        ((388, 500), None, False),
+        ((500, 388), None, False),
+        ((500, 250), "curve", True),
+        ((500, 112), None, False),
+        ((388, 0), None, False),
+        ((250, 0), "curve", True),
+        ((112, 0), None, False),
+        ((0, 112), None, False)
+    ]
+
+def makeCurveLineContour(angle):
+    # line to curve, curve to line and a smooth
+    # flag between two lines, which is skipped.
+    return [
+        ((0, 0), "line", False),
+        ((300, 0), "line", True),
+        (rotate((400, 0), (300, 0), angle), None, False),
+        (rotate((500, 100), (500, 200), -angle), None, False),
+        ((500, 200), "curve", True),
+        ((500, 300), "line", False),
+        ((0, 300), "line", True)
+    ]
+
+def makeOffCurveContour(angle):
+    # a quadratic contour without on-curve points
+    return [
+        ((0, 0), None, False),
+        (rotate((200, 0), (0, 0), angle), None, True),
+        ((200, 200), None, False),
+        ((0, 200), None, True)
+    ]
+
+def makeBrokenContour(angle):
+    # a corner marked as smooth
+    return [
+        ((0, 0), "curve", True),
+        (rotate((0, 100), (0, 0), 90 + angle), None, False),
+        ((200, 200), None, False),
+        ((300, 200), "curve", False),
+        ((200, 0), None, False),
+        ((100, -100), None, False)
+    ]
+
+contourMakers = [
+    makeSmoothContour,
+    makeCurveLineContour,
+    makeOffCurveContour,
+    makeBrokenContour
+]
+
+# the tolerance is 0.05 and the threshold is 2
+edgeAngles = [
+    0, 0.01, 0.0499, 0.05, 0.0501, 0.0505, 0.051,
+    0.5, 1.9995, 2, 2.0005, 2.001, 30, 90
+]
+edgeAngles += [-angle for angle in edgeAngles if angle]
+
+def compareKinks(glyphs):
+    model = glyphs[0]
+    kinkModel = KinkModel(compileGlyphFromPoints(model))
+    results = findKinks([compileGlyphFromPoints(glyph) for glyph in glyphs], kinkModel)
+    for glyph, kinks in zip(glyphs, results):
+        expected = findBaselineKinks(model, glyph)
+        assert len(kinks) == len(expected)
+        for (x, y, intensity), (expectedX, expectedY, expectedIntensity) in zip(sorted(kinks), sorted(expected)):
+            assert (x, y) == pytest.approx((expectedX, expectedY), abs=1e-9)
+            assert intensity == expectedIntensity
+
+@pytest.mark.parametrize("contourMaker", contourMakers)
+def test_thresholdEdges(contourMaker):
+    glyphs = [makeGlyph([contourMaker(angle)]) for angle in [0] + edgeAngles]
+    compareKinks(glyphs)
+
+def test_randomAngles():
+    randomGenerator = random.Random(6)
+    glyphs = [makeGlyph([maker(0) for maker in contourMakers])]
+    for i in range(500):
+        angle = randomGenerator.uniform(-3, 3)
+        glyphs.append(makeGlyph([maker(angle) for maker in contourMakers]))
+    compareKinks(glyphs)
@@ -0,0 +1,60 @@
+import os
+import sys
+import random
+import itertools
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "lib"))
+
+from fontTools.designspaceLib import (
+    RuleDescriptor,
+    processRules
+)
+from spaceranger.rules import RuleSubstitutions
+
+def makeRules():
+    heavy = RuleDescriptor()
+    heavy.name = "heavy"
+    heavy.conditionSets.append([
+        dict(name="weight", minimum=400, maximum=700)
+    ])
+    heavy.subs.append(("dollar", "dollar.heavy"))
+    wide = RuleDescriptor()
+    wide.name = "wide"
+    wide.conditionSets.append([
+        dict(name="width", minimum=200),
+        dict(name="weight", maximum=400)
+    ])
+    wide.conditionSets.append([
+        dict(name="width", minimum=800, maximum=800)
+    ])
+    wide.subs.append(("n", "n.wide"))
+    wide.subs.append(("dollar", "dollar.wide"))
+    return [heavy, wide]
+
+def test_boundsMatchProcessRules():
+    rules = makeRules()
+    glyphNames = ["n", "dollar", "o"]
+    values = []
+    for bound in (0, 200, 400, 700, 800, 1000):
+        values.extend((bound - 0.001, bound, bound + 0.001))
+    locations = [
+        dict(width=width, weight=weight)
+        for width, weight in itertools.product(values, values)
+    ]
+    # the regions are cached, so the order
+    # the locations are seen in mustn't matter.
+    for seed in range(3):
+        random.Random(seed).shuffle(locations)
+        substitutions = RuleSubstitutions(rules)
+        for location in locations:
+            expected = processRules(rules, location, glyphNames)
+            assert substitutions.process(location, glyphNames) == expected, location
+
+def test_boundsAreInclusive():
+    substitutions = RuleSubstitutions(makeRules())
+    glyphNames = ["dollar"]
+    assert substitutions.process(dict(width=0, weight=400), glyphNames) == ["dollar.heavy"]
+    assert substitutions.process(dict(width=0, weight=700), glyphNames) == ["dollar.heavy"]
+    assert substitutions.process(dict(width=0, weight=700.001), glyphNames) == ["dollar"]
+    assert substitutions.process(dict(width=800, weight=1000), glyphNames) == ["dollar.wide"]
+    assert substitutions.process(dict(width=800.001, weight=1000), glyphNames) == ["dollar"]
@@ -0,0 +1,46 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "lib"))
+
+from spaceranger.scheduler import UpdateScheduler
+
+class FakeCallLater:
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, delay, function, *args):
+        self.calls.append((function, args))
+
+    def runNext(self):
+        function, args = self.calls.pop(0)
+        function(*args)
+
+
+def test_asynchronousCallbackError():
+    callLater = FakeCallLater()
+    refreshes = []
+
+    def callback(glyphNames, kerning):
+        refreshes.append(glyphNames)
+        if len(refreshes) == 1:
+            # a request arrives before the error
+            scheduler.schedule(glyphNames=["b"])
+            raise ValueError("bad designspace")
+
+    scheduler = UpdateScheduler(callback, callLater, asynchronous=True)
+    scheduler.schedule(glyphNames=["a"])
+    with pytest.raises(ValueError):
+        callLater.runNext()
+    assert not scheduler.isRunning()
+    # the request that arrived during the failed
+    # refresh is still performed.
+    assert scheduler.isPending()
+    callLater.runNext()
+    assert refreshes == [{"a"}, {"b"}]
+    assert scheduler.isRunning()
+    scheduler.refreshDidFinish()
+    assert not scheduler.isRunning()
+    assert not scheduler.isPending()
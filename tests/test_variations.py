@@ -0,0 +1,156 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "source", "lib"))
+
+from fontParts.fontshell import RFont
+from fontTools.designspaceLib import (
+    DesignSpaceDocument,
+    AxisDescriptor,
+    SourceDescriptor
+)
+from ufoProcessor.ufoOperator import UFOOperator
+from spaceranger.outlines import compileGlyphFromPoints
+from spaceranger.variations import GlyphVariationModels
+from spaceranger.kerning import KerningEvaluator
+
+# (name, width, weight) of the corner sources and an
+# intermediate source that isn't on an axis.
+sourceLocations = [
+    ("light", 0, 0),
+    ("bold", 0, 1000),
+    ("wideLight", 1000, 0),
+    ("wideBold", 1000, 1000),
+    ("intermediate", 400, 300)
+]
+
+def drawOutline(glyph, width, weight, offset=0):
+    stem = 50 + weight * 0.15 + offset
+    right = 300 + width * 0.2
+    pen = glyph.getPointPen()
+    pen.beginPath()
+    pen.addPoint((0, 0), "line")
+    pen.addPoint((stem, 0), "line")
+    pen.addPoint((stem, 300), "line", smooth=True)
+    pen.addPoint((stem + 50, 400 - weight * 0.02), None)
+    pen.addPoint((right - stem, 420 + offset), None)
+    pen.addPoint((right - stem, 300), "curve", smooth=True)
+    pen.addPoint((right - stem, 0), "line")
+    pen.addPoint((right, 0), "line")
+    pen.addPoint((right, 350), "line", smooth=True)
+    pen.addPoint((right, 480), None)
+    pen.addPoint((0, 500), None)
+    pen.addPoint((0, 400), "curve")
+    pen.endPath()
+    glyph.width = right + 40 + weight * 0.05
+
+def makeDesignspace(directory):
+    doc = DesignSpaceDocument()
+    for axisName, tag in (("width", "wdth"), ("weight", "wght")):
+        axis = AxisDescriptor()
+        axis.name = axisName
+        axis.tag = tag
+        axis.minimum = 0
+        axis.default = 0
+        axis.maximum = 1000
+        doc.addAxis(axis)
+    for sourceName, width, weight in sourceLocations:
+        font = RFont()
+        font.info.unitsPerEm = 1000
+        drawOutline(font.newGlyph("n"), width, weight)
+        # a glyph made from a component
+        composite = font.newGlyph("n.composite")
+        composite.appendComponent("n", offset=(20 + weight * 0.01, 0))
+        composite.width = font["n"].width + 40
+        font.kerning[("n.composite", "n")] = -10 - weight * 0.02 + width * 0.01
+        # a glyph that the intermediate source doesn't have
+        if sourceName != "intermediate":
+            drawOutline(font.newGlyph("m"), width, weight, offset=20)
+        # a glyph with incompatible sources
+        incompatible = font.newGlyph("x")
+        drawOutline(incompatible, width, weight)
+        if sourceName == "wideBold":
+            pen = incompatible.getPen()
+            pen.moveTo((0, 0))
+            pen.lineTo((10, 10))
+            pen.lineTo((10, 0))
+            pen.closePath()
+        path = os.path.join(directory, f"{sourceName}.ufo")
+        font.save(path)
+        source = SourceDescriptor()
+        source.path = path
+        source.name = sourceName
+        source.location = dict(width=width, weight=weight)
+        doc.addSource(source)
+    path = os.path.join(directory, "test.designspace")
+    doc.write(path)
+    return path
+
+# the grid locations plus some outside of the axes,
+# which the operator clips.
+testLocations = [
+    dict(width=width, weight=weight)
+    for width in (0, 125, 400, 500, 875, 1000)
+    for weight in (0, 150, 300, 333.3, 1000)
+] + [
+    dict(width=-200, weight=500),
+    dict(width=1200, weight=1500)
+]
+
+def makeExpectedGlyph(ufoOperator, glyphName, location):
+    mathGlyph = ufoOperator.makeOneGlyph(glyphName, location, useVarlib=ufoOperator.useVarlib)
+    if mathGlyph is None:
+        return None
+    return compileGlyphFromPoints(mathGlyph)
+
+def assertGlyphsEqual(glyph, expected):
+    assert glyph.width == pytest.approx(expected.width, abs=1e-9)
+    assert glyph.pointTypes.tolist() == expected.pointTypes.tolist()
+    assert glyph.contourEnds.tolist() == expected.contourEnds.tolist()
+    assert glyph.coordinates.shape == expected.coordinates.shape
+    assert glyph.coordinates.ravel().tolist() == pytest.approx(expected.coordinates.ravel().tolist(), abs=1e-9)
+
+@pytest.fixture(params=[False, True], ids=["mutatorMath", "varLib"])
+def ufoOperator(request, tmp_path):
+    ufoOperator = UFOOperator(makeDesignspace(str(tmp_path)), useVarlib=request.param)
+    ufoOperator.loadFonts()
+    return ufoOperator
+
+@pytest.mark.parametrize("glyphName", ["n", "n.composite", "m"])
+def test_modelMatchesOperator(ufoOperator, glyphName):
+    models = GlyphVariationModels(ufoOperator)
+    model = models.getModel(glyphName)
+    assert model.compatible
+    glyphs = model.makeGlyphs(testLocations)
+    widths = model.interpolateWidths(testLocations)
+    for location, glyph, width in zip(testLocations, glyphs, widths):
+        expected = makeExpectedGlyph(ufoOperator, glyphName, location)
+        assertGlyphsEqual(glyph, expected)
+        assert width == glyph.width
+
+def test_sourceWeightsShared(ufoOperator):
+    models = GlyphVariationModels(ufoOperator)
+    n = models.getModel("n")
+    composite = models.getModel("n.composite")
+    m = models.getModel("m")
+    assert n.sourceWeights is composite.sourceWeights
+    assert n.sourceWeights is not m.sourceWeights
+
+def test_fallbackMatchesOperator(ufoOperator):
+    models = GlyphVariationModels(ufoOperator)
+    model = models.getModel("x")
+    assert not model.compatible
+    for location, mathGlyph in zip(testLocations, model.makeFallbackGlyphs(testLocations)):
+        expected = makeExpectedGlyph(ufoOperator, "x", location)
+        if expected is None:
+            assert mathGlyph is None
+        else:
+            assertGlyphsEqual(compileGlyphFromPoints(mathGlyph), expected)
+
+def test_componentKerningMatchesOperator(ufoOperator):
+    pair = ("n.composite", "n")
+    evaluator = KerningEvaluator(ufoOperator, [pair])
+    for location, kerning in zip(testLocations, evaluator.evaluate(testLocations)):
+        expected = ufoOperator.makeOneKerning(location, pairs=[pair])[pair]
+        assert kerning[pair] == pytest.approx(expected, abs=1e-9)